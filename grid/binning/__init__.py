@@ -1,2 +1,4 @@
 from .binned import *
 from .unbinned import *
+from .online import *
+from .pyramid import *
@@ -12,4 +12,381 @@ def remove_zero_bins(data: TimeBins):
 
 
 def get_edges(data: TimeBins):
-    return np.sort(np.unique(np.hstack((data.lo_edges, data.hi_edges))))
+    # the bins are ordered, so a repeated edge, where a bin starts at the end
+    # of the previous one or has no width, follows its first occurrence
+    edges = np.empty(2 * data.lo_edges.size)
+    edges[0::2] = data.lo_edges
+    edges[1::2] = data.hi_edges
+    keep = np.ones(edges.size, dtype=bool)
+    keep[1:] = edges[1:] != edges[:-1]
+    return edges[keep]
+
+
+def _combine(index, counts, deficit):
+    """Sum the counts and exposure deficits of the entries of the same bin
+
+    Parameters
+    ----------
+    index: np.array
+        The bin of each entry
+    counts: np.array
+        The counts of each entry
+    deficit: np.array
+        The exposure each entry removes from its bin
+
+    Returns
+    -------
+    : np.array
+        The bins with a count or a deficit, ordered
+    : np.array
+        The counts of each bin
+    : np.array
+        The deficit of each bin
+    """
+    if np.any(index[1:] < index[:-1]):
+        order = np.argsort(index, kind="stable")
+        index, counts, deficit = index[order], counts[order], deficit[order]
+    if index.size == 0:
+        return index, counts, deficit
+
+    first = np.flatnonzero(np.diff(index, prepend=index[0] - 1))
+    counts = np.add.reduceat(counts, first)
+    deficit = np.add.reduceat(deficit, first)
+    keep = (counts != 0) | (deficit != 0)
+    return index[first][keep], counts[keep], deficit[keep]
+
+
+def _in_gaps(index, gaps):
+    """Whether bins are inside ordered, disjoint gaps
+
+    Parameters
+    ----------
+    index: np.array
+        The bins
+    gaps: np.array
+        The (start, stop) bin ranges, shape (n, 2)
+
+    Returns
+    -------
+    : np.array
+        True for the bins inside a gap
+    """
+    if gaps.size == 0:
+        return np.zeros(index.shape, dtype=bool)
+    pos = np.searchsorted(gaps[:, 0], index, side="right") - 1
+    return (pos >= 0) & (index < gaps[np.maximum(pos, 0), 1])
+
+
+class SparseTimeBins:
+    """Uniform time bins that only store the non-empty bins
+
+    A bin that is not stored has no counts and the full bin width as exposure.
+    The bins that are entirely outside of the good time intervals are stored
+    as gaps, ranges of bins without exposure, a stored bin inside a gap keeps
+    its counts but has no exposure. The memory scales with the number of
+    occupied bins instead of the time span.
+
+    Parameters
+    ----------
+    tstart: float
+        The start time of the first bin
+    dt: float
+        The width of the bins
+    num_bins: int
+        The number of bins
+    index: np.array
+        The ordered bins that have counts or less than the full exposure
+    counts: np.array
+        The counts of each stored bin
+    exposure: np.array
+        The exposure of each stored bin
+    gaps: np.array, optional
+        The (start, stop) bin ranges without exposure, shape (n, 2)
+    """
+
+    def __init__(self, tstart, dt, num_bins, index, counts, exposure, gaps=None):
+        if dt <= 0.0:
+            raise ValueError("dt must be positive")
+        self._tstart = float(tstart)
+        self._dt = float(dt)
+        self._num_bins = int(num_bins)
+        self._index = np.asarray(index, dtype=np.int64)
+        self._counts = np.asarray(counts, dtype=np.float64)
+        self._exposure = np.asarray(exposure, dtype=np.float64)
+        if gaps is None:
+            gaps = np.zeros((0, 2), dtype=np.int64)
+        self._gaps = np.asarray(gaps, dtype=np.int64).reshape(-1, 2)
+
+    @classmethod
+    def from_events(cls, times, dt, tstart=None, tstop=None, gti=None):
+        """Bin events directly into sparse time bins
+
+        Parameters
+        ----------
+        times: np.array
+            time of each event
+        dt: float
+            The width of the bins
+        tstart: float, optional
+            The start time of the first bin, by default the first event
+        tstop: float, optional
+            The stop time of the bins, by default the last event. The last
+            bin loses the exposure after ``tstop``.
+        gti: np.array, optional
+            The (start, stop) good time intervals, shape (n, 2). Bins entirely
+            outside are gaps and bins partially outside lose the exposure
+            outside. If omitted, all the bins are good.
+
+        Returns
+        -------
+        : :class:`SparseTimeBins`
+            The sparse time bins
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if np.any(times[1:] < times[:-1]):
+            times = np.sort(times)
+        tstart = times[0] if tstart is None else tstart
+        tstop = times[-1] if tstop is None else tstop
+        num_bins = max(int(np.ceil((tstop - tstart) / dt)), 1)
+
+        # the events are ordered, so are their bins
+        times = times[(times >= tstart) & (times <= tstop)]
+        index = np.minimum(((times - tstart) // dt).astype(np.int64), num_bins - 1)
+        if index.size > 0:
+            first = np.flatnonzero(np.diff(index, prepend=index[0] - 1))
+            counts = np.diff(np.append(first, index.size)).astype(np.float64)
+            index = index[first]
+        else:
+            counts = np.zeros(0)
+
+        obj = cls(tstart, dt, num_bins, index, counts, np.full(index.size, dt))
+        # the time after tstop in the last bin is not exposed
+        bad = np.array([[tstop, obj.tstop]])
+        if gti is not None:
+            gti = np.reshape(gti, (-1, 2))
+            bad = np.column_stack(
+                (np.append(tstart, gti[:, 1]), np.append(gti[:, 0], obj.tstop))
+            )
+        return obj._exclude(bad[bad[:, 1] > bad[:, 0]])
+
+    @classmethod
+    def from_timebins(cls, bins: TimeBins):
+        """Convert uniform dense time bins
+
+        Parameters
+        ----------
+        bins: :class:`~gbm.data.primitives.TimeBins`
+            The uniform time bins
+
+        Returns
+        -------
+        : :class:`SparseTimeBins`
+            The sparse time bins
+        """
+        widths = bins.hi_edges - bins.lo_edges
+        dt = widths[0]
+        if not np.allclose(widths, dt) or not np.allclose(
+            bins.lo_edges[1:], bins.hi_edges[:-1]
+        ):
+            raise ValueError("the time bins must be uniform and contiguous")
+
+        gap = (bins.counts == 0) & (bins.exposure <= 0)
+        stored = ~gap & ((bins.counts != 0) | ~np.isclose(bins.exposure, widths))
+        index = np.flatnonzero(stored)
+
+        # gaps are the runs of bins without exposure
+        change = np.flatnonzero(np.diff(gap.astype(np.int8), prepend=0, append=0))
+        gaps = change.reshape(-1, 2)
+        return cls(
+            bins.lo_edges[0],
+            dt,
+            bins.counts.size,
+            index,
+            bins.counts[index],
+            bins.exposure[index],
+            gaps,
+        )
+
+    @property
+    def tstart(self):
+        """(float): The start time of the first bin"""
+        return self._tstart
+
+    @property
+    def tstop(self):
+        """(float): The stop time of the last bin"""
+        return self._tstart + self._num_bins * self._dt
+
+    @property
+    def dt(self):
+        """(float): The width of the bins"""
+        return self._dt
+
+    @property
+    def num_bins(self):
+        """(int): The number of bins"""
+        return self._num_bins
+
+    @property
+    def index(self):
+        """(np.array): The stored bins"""
+        return self._index
+
+    @property
+    def counts(self):
+        """(np.array): The counts of the stored bins"""
+        return self._counts
+
+    @property
+    def exposure(self):
+        """(np.array): The exposure of the stored bins"""
+        return self._exposure
+
+    @property
+    def gaps(self):
+        """(np.array): The (start, stop) bin ranges without exposure"""
+        return self._gaps
+
+    @property
+    def size(self):
+        """(int): The number of stored bins"""
+        return self._index.size
+
+    def _bin(self, time, round_up=False):
+        """The bin of a time, clipped to the bins"""
+        value = (time - self._tstart) / self._dt
+        value = np.ceil(value) if round_up else np.floor(value)
+        return int(np.clip(value, 0, self._num_bins))
+
+    def _exclude(self, intervals):
+        """Remove the exposure of time intervals, the bins entirely inside
+        become gaps"""
+        index, counts = [self._index], [self._counts]
+        deficit = [self._dt - self._exposure]
+        gaps = [self._gaps]
+        for start, stop in intervals:
+            lo, hi = self._bin(start, True), self._bin(stop)
+            if lo < hi:
+                gaps.append([[lo, hi]])
+            # the bins partially inside lose the part inside
+            for i in {self._bin(start), hi}:
+                if lo <= i < hi or i >= self._num_bins:
+                    continue
+                bin_start = self._tstart + i * self._dt
+                overlap = min(stop, bin_start + self._dt) - max(start, bin_start)
+                if overlap > 0:
+                    index.append([i])
+                    counts.append([0.0])
+                    deficit.append([overlap])
+
+        index, counts, deficit = _combine(
+            np.concatenate(index), np.concatenate(counts), np.concatenate(deficit)
+        )
+        gaps = np.vstack(gaps)
+        gaps = gaps[np.argsort(gaps[:, 0], kind="stable")]
+        # the stored bins inside the gaps lose all their exposure
+        deficit[_in_gaps(index, gaps)] = self._dt
+        return SparseTimeBins(
+            self._tstart,
+            self._dt,
+            self._num_bins,
+            index,
+            counts,
+            self._dt - deficit,
+            gaps,
+        )
+
+    def slice(self, tstart, tstop):
+        """The bins overlapping a time range
+
+        Parameters
+        ----------
+        tstart, tstop: float
+            The time range
+
+        Returns
+        -------
+        : :class:`SparseTimeBins`
+            The bins overlapping the time range
+        """
+        lo, hi = self._bin(tstart), self._bin(tstop, True)
+        hi = max(hi, lo + 1) if lo < self._num_bins else lo
+        start, stop = np.searchsorted(self._index, [lo, hi])
+
+        gaps = np.clip(self._gaps, lo, hi) - lo
+        return SparseTimeBins(
+            self._tstart + lo * self._dt,
+            self._dt,
+            hi - lo,
+            self._index[start:stop] - lo,
+            self._counts[start:stop],
+            self._exposure[start:stop],
+            gaps[gaps[:, 1] > gaps[:, 0]],
+        )
+
+    def rebin(self, factor):
+        """Merge groups of consecutive bins
+
+        Parameters
+        ----------
+        factor: int
+            The number of bins to merge, the last bin may be partial
+
+        Returns
+        -------
+        : :class:`SparseTimeBins`
+            The merged bins
+        """
+        factor = int(factor)
+        if factor < 1:
+            raise ValueError("factor must be a positive integer")
+        num_bins = -(-self._num_bins // factor)
+
+        # the exposure of the gaps is removed with the gaps themselves
+        index, counts = [self._index // factor], [self._counts]
+        deficit = [
+            np.where(_in_gaps(self._index, self._gaps), 0.0, self._dt - self._exposure)
+        ]
+        gaps = []
+        ranges = list(self._gaps)
+        # the missing bins after the end of the last bin are a gap too
+        if num_bins * factor > self._num_bins:
+            ranges.append((self._num_bins, num_bins * factor))
+        for lo, hi in ranges:
+            new_lo, new_hi = -(-lo // factor), hi // factor
+            if new_lo < new_hi:
+                gaps.append([new_lo, new_hi])
+            # the merged bins partially inside lose the part inside
+            for i in {lo // factor, new_hi}:
+                if new_lo <= i < new_hi or i >= num_bins:
+                    continue
+                overlap = min(hi, (i + 1) * factor) - max(lo, i * factor)
+                if overlap > 0:
+                    index.append([i])
+                    counts.append([0.0])
+                    deficit.append([overlap * self._dt])
+
+        index, counts, deficit = _combine(
+            np.concatenate(index), np.concatenate(counts), np.concatenate(deficit)
+        )
+        dt = self._dt * factor
+        return SparseTimeBins(
+            self._tstart, dt, num_bins, index, counts, dt - deficit, gaps or None
+        )
+
+    def to_dense(self):
+        """Convert to dense time bins
+
+        Returns
+        -------
+        : :class:`~gbm.data.primitives.TimeBins`
+            The time bins
+        """
+        edges = self._tstart + self._dt * np.arange(self._num_bins + 1)
+        counts = np.zeros(self._num_bins)
+        counts[self._index] = self._counts
+        exposure = np.full(self._num_bins, self._dt)
+        exposure[self._index] = self._exposure
+        for lo, hi in self._gaps:
+            exposure[lo:hi] = 0.0
+        return TimeBins(counts, edges[:-1], edges[1:], exposure)
@@ -0,0 +1,156 @@
+import numpy as np
+
+from gbm.data.primitives import TimeBins
+
+
+class OnlineBinning:
+    """Incremental binning of a time-ordered event stream
+
+    The events are fed chunk by chunk with :meth:`update`, which returns the
+    bins finalized by the chunk and keeps the last, partially filled bin.
+    The cost of an update only depends on the size of the chunk and the
+    number of finalized bins, not on the events received before.
+
+    Bins are made of cells of width ``dt`` aligned to ``tstart``. Without
+    ``maxN`` each cell is a bin (fixed-width binning). With ``maxN`` a bin
+    grows cell by cell and is finalized at the end of the first cell where
+    its count exceeds ``maxN``, like :func:`bin_by_max_count`, or where its
+    width reaches ``max_width``.
+
+    Parameters
+    ----------
+    dt: float
+        The width of the cells in seconds
+    maxN: int, optional
+        The count threshold of the adaptive binning. If omitted, the bins
+        are the cells.
+    max_width: float, optional
+        The maximum width of an adaptive bin in seconds, rounded down to a
+        whole number of cells. If omitted, a bin only closes on its count.
+    tstart: float, optional
+        The start time of the first cell. If omitted, uses the time of the
+        first event.
+    """
+
+    def __init__(self, dt, maxN=None, max_width=None, tstart=None):
+        if dt <= 0.0:
+            raise ValueError("dt must be positive")
+        self._dt = float(dt)
+        self._maxN = maxN
+        self._max_cells = None
+        if max_width is not None:
+            self._max_cells = max(int(max_width // self._dt), 1)
+        self._tstart = None if tstart is None else float(tstart)
+
+        # the open bin spans the cells [_bin_start, _cell], _count holds the
+        # counts of its closed cells and _cell_count the counts of _cell
+        self._bin_start = 0
+        self._cell = 0
+        self._count = 0
+        self._cell_count = 0
+
+    @property
+    def tstart(self):
+        """(float): The start time of the first cell"""
+        return self._tstart
+
+    @property
+    def pending(self):
+        """(int): The number of events in the open bin"""
+        return self._count + self._cell_count
+
+    def _edge(self, cell):
+        """The start time of cells"""
+        return self._tstart + np.asarray(cell) * self._dt
+
+    def _bins(self, counts, start, stop):
+        """TimeBins of the cell ranges [start, stop)"""
+        lo_edges, hi_edges = self._edge(start), self._edge(stop)
+        return TimeBins(
+            np.asarray(counts, dtype=np.float64),
+            lo_edges,
+            hi_edges,
+            hi_edges - lo_edges,
+        )
+
+    def update(self, times, tnow=None):
+        """Add a chunk of events and finalize the bins that ended
+
+        Parameters
+        ----------
+        times: np.array
+            The time-ordered times of the new events, not earlier than the
+            events of the previous chunks
+        tnow: float, optional
+            The time up to which the stream is complete, closes the bins that
+            ended without events. If omitted, uses the time of the last event.
+
+        Returns
+        -------
+        : :class:`~gbm.data.primitives.TimeBins`
+            The finalized bins, possibly empty
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if self._tstart is None:
+            if times.size == 0:
+                return self._bins([], [], [])
+            self._tstart = times[0]
+
+        if times.size > 0:
+            if times[0] < self._edge(self._cell):
+                raise ValueError("events must not be earlier than the open bin")
+            tnow = times[-1] if tnow is None else max(tnow, times[-1])
+        elif tnow is None:
+            return self._bins([], [], [])
+
+        # counts of the cells from the open cell to the cell of tnow
+        last = max(int((tnow - self._tstart) // self._dt), self._cell)
+        cells = ((times - self._tstart) // self._dt).astype(np.int64) - self._cell
+        counts = np.bincount(cells, minlength=last - self._cell + 1)
+        counts[0] += self._cell_count
+
+        # all but the last cell are closed
+        closed, first = counts[:-1], self._cell
+        self._cell, self._cell_count = last, int(counts[-1])
+        if self._maxN is None:
+            cell = np.arange(first, last)
+            self._bin_start = last
+            return self._bins(closed, cell, cell + 1)
+        return self._close(closed, first)
+
+    def _close(self, closed, first):
+        """Finalize the adaptive bins among the newly closed cells"""
+        cumulative = self._count + np.cumsum(closed)
+        starts, stops, counts = [], [], []
+        base = 0
+        while True:
+            # first closed cell where the count of the bin exceeds maxN
+            k = np.searchsorted(cumulative, base + self._maxN, side="right")
+            if self._max_cells is not None:
+                k = min(k, self._bin_start + self._max_cells - 1 - first)
+            if k >= closed.size:
+                break
+            starts.append(self._bin_start)
+            stops.append(first + k + 1)
+            counts.append(cumulative[k] - base)
+            base = cumulative[k]
+            self._bin_start = first + k + 1
+
+        self._count = int(cumulative[-1] - base) if closed.size else self._count
+        return self._bins(counts, starts, stops)
+
+    def flush(self):
+        """Finalize the open bin, e.g. at the end of the stream
+
+        Returns
+        -------
+        : :class:`~gbm.data.primitives.TimeBins`
+            The open bin, empty if no event was added
+        """
+        if self._tstart is None:
+            return self._bins([], [], [])
+
+        bins = self._bins([self.pending], [self._bin_start], [self._cell + 1])
+        self._bin_start = self._cell = self._cell + 1
+        self._count = self._cell_count = 0
+        return bins
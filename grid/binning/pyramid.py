@@ -0,0 +1,267 @@
+import numpy as np
+
+from gbm.binning.unbinned import bin_by_time
+from gbm.data.primitives import TimeBins
+
+from ..data.cache import read_cache, write_cache
+
+
+class LightCurvePyramid:
+    """Light curves of the same events at timescales growing geometrically
+
+    Level 0 holds the finest uniform bins, each coarser level sums ``factor``
+    consecutive bins of the previous one. A light curve at the timescale of
+    a level over a time range is then a slice of the level instead of a new
+    binning of the events.
+
+    Parameters
+    ----------
+    tstart: float
+        The start time of the first bin
+    dt: float
+        The width of the bins of the finest level
+    factor: int
+        The number of bins of a level merged into a bin of the next level
+    counts: list of np.array
+        The counts of each level, shape (number of bands, number of bins)
+    exposure: list of np.array
+        The exposure of each level
+    bands: [(float, float), ...], optional
+        The energy range of each band
+    """
+
+    def __init__(self, tstart, dt, factor, counts, exposure, bands=None):
+        self._tstart = float(tstart)
+        self._dt = float(dt)
+        self._factor = int(factor)
+        self._counts = list(counts)
+        self._exposure = list(exposure)
+        self._bands = None
+        if bands is not None:
+            self._bands = [(float(emin), float(emax)) for emin, emax in bands]
+
+    @classmethod
+    def from_timebins(cls, lightcurves, factor=2, levels=None, bands=None):
+        """Build a pyramid from finest light curves sharing the same uniform bins
+
+        Parameters
+        ----------
+        lightcurves: list of :class:`~gbm.data.primitives.TimeBins`
+            The finest light curve of each band
+        factor: int, optional
+            The number of bins merged into a bin of the next level, by default 2
+        levels: int, optional
+            The number of levels. If omitted, levels are added until a level
+            has a single bin.
+        bands: [(float, float), ...], optional
+            The energy range of each band
+
+        Returns
+        -------
+        : :class:`LightCurvePyramid`
+            The pyramid
+        """
+        if factor < 2:
+            raise ValueError("factor must be at least 2")
+        first = lightcurves[0]
+        counts = np.vstack([lightcurve.counts for lightcurve in lightcurves])
+        exposure = np.asarray(first.exposure, dtype=np.float64)
+        dt = first.hi_edges[0] - first.lo_edges[0]
+
+        all_counts, all_exposure = [counts], [exposure]
+        while (levels is None and counts.shape[1] > 1) or (
+            levels is not None and len(all_counts) < levels
+        ):
+            # pad the last bin of the level with empty bins
+            num_bins = -(-counts.shape[1] // factor)
+            pad = num_bins * factor - counts.shape[1]
+            counts = np.pad(counts, ((0, 0), (0, pad)))
+            counts = counts.reshape(counts.shape[0], num_bins, factor).sum(axis=2)
+            exposure = np.pad(exposure, (0, pad)).reshape(num_bins, factor).sum(axis=1)
+            all_counts.append(counts)
+            all_exposure.append(exposure)
+
+        return cls(first.lo_edges[0], dt, factor, all_counts, all_exposure, bands)
+
+    @classmethod
+    def from_evt(cls, evt, dt, factor=2, levels=None, bands=None, time_range=None):
+        """Build a pyramid from the events of an Evt object
+
+        The events are binned once at the finest timescale.
+
+        Parameters
+        ----------
+        evt: :class:`~grid.data.Evt`
+            The Evt object
+        dt: float
+            The width of the bins of the finest level
+        factor: int, optional
+            The number of bins merged into a bin of the next level, by default 2
+        levels: int, optional
+            The number of levels. If omitted, levels are added until a level
+            has a single bin.
+        bands: [(float, float), ...], optional
+            The energy range of each band. If omitted, a single light curve of
+            all channels.
+        time_range: (float, float), optional
+            The time range of the light curves. If omitted, uses the entire time range of the data.
+
+        Returns
+        -------
+        : :class:`LightCurvePyramid`
+            The pyramid
+        """
+        # a single band of all channels, without the count matrix of to_phaii
+        lightcurves = evt.to_lightcurves(
+            bin_by_time,
+            dt,
+            bands=[(-np.inf, np.inf)] if bands is None else bands,
+            time_range=time_range,
+        )
+        return cls.from_timebins(lightcurves, factor, levels, bands)
+
+    @classmethod
+    def open(cls, path):
+        """Open a pyramid written by :meth:`write`, the levels are memory-mapped
+
+        Parameters
+        ----------
+        path: str
+            The path of the file
+
+        Returns
+        -------
+        : :class:`LightCurvePyramid`
+            The pyramid
+        """
+        arrays, meta = read_cache(path)
+        num_levels = meta["levels"]
+        return cls(
+            meta["tstart"],
+            meta["dt"],
+            meta["factor"],
+            [arrays["COUNTS{}".format(i)] for i in range(num_levels)],
+            [arrays["EXPOSURE{}".format(i)] for i in range(num_levels)],
+            meta["bands"],
+        )
+
+    def write(self, path):
+        """Write the pyramid to a memory-mappable file
+
+        Parameters
+        ----------
+        path: str
+            The path of the file
+        """
+        arrays = {}
+        for i, (counts, exposure) in enumerate(zip(self._counts, self._exposure)):
+            arrays["COUNTS{}".format(i)] = counts
+            arrays["EXPOSURE{}".format(i)] = exposure
+        meta = {
+            "tstart": self._tstart,
+            "dt": self._dt,
+            "factor": self._factor,
+            "levels": len(self._counts),
+            "bands": self._bands,
+        }
+        write_cache(path, arrays, meta)
+
+    @property
+    def tstart(self):
+        """(float): The start time of the first bin"""
+        return self._tstart
+
+    @property
+    def bands(self):
+        """(list): The energy range of each band, None for a single light curve
+        of all channels"""
+        return self._bands
+
+    @property
+    def num_levels(self):
+        """(int): The number of levels"""
+        return len(self._counts)
+
+    @property
+    def timescales(self):
+        """(np.array): The bin width of each level"""
+        return self._dt * self._factor ** np.arange(len(self._counts))
+
+    def level(self, timescale):
+        """The level of a timescale
+
+        Parameters
+        ----------
+        timescale: float
+            The bin width
+
+        Returns
+        -------
+        : int
+            The level
+        """
+        match = np.flatnonzero(np.isclose(self.timescales, timescale))
+        if match.size == 0:
+            raise ValueError(
+                "{} is not a timescale of the pyramid: {}".format(
+                    timescale, self.timescales
+                )
+            )
+        return int(match[0])
+
+    def _rows(self, level, time_range):
+        """The bins of a level overlapping a time range"""
+        num_bins = self._exposure[level].size
+        if time_range is None:
+            return 0, num_bins
+        width = self.timescales[level]
+        start = np.floor((time_range[0] - self._tstart) / width)
+        stop = np.ceil((time_range[1] - self._tstart) / width)
+        start, stop = np.clip([start, stop], 0, num_bins).astype(int)
+        return start, max(start, stop)
+
+    def counts(self, timescale, time_range=None):
+        """The counts at a timescale, a view of the level
+
+        Parameters
+        ----------
+        timescale: float
+            The bin width, one of :attr:`timescales`
+        time_range: (float, float), optional
+            Only the bins overlapping the time range. If omitted, all bins.
+
+        Returns
+        -------
+        : np.array
+            The counts of each band and bin
+        """
+        level = self.level(timescale)
+        start, stop = self._rows(level, time_range)
+        return self._counts[level][:, start:stop]
+
+    def lightcurve(self, timescale, time_range=None, band=0):
+        """The light curve of a band at a timescale
+
+        Parameters
+        ----------
+        timescale: float
+            The bin width, one of :attr:`timescales`
+        time_range: (float, float), optional
+            Only the bins overlapping the time range. If omitted, all bins.
+        band: int, optional
+            The band, by default 0
+
+        Returns
+        -------
+        : :class:`~gbm.data.primitives.TimeBins`
+            The light curve
+        """
+        level = self.level(timescale)
+        start, stop = self._rows(level, time_range)
+        edges = self._tstart + self.timescales[level] * np.arange(start, stop + 1)
+        return TimeBins(
+            np.asarray(self._counts[level][band, start:stop]),
+            edges[:-1],
+            edges[1:],
+            np.asarray(self._exposure[level][start:stop]),
+        )
@@ -0,0 +1,88 @@
+import json
+import struct
+
+import numpy as np
+
+#: file signature of a cache file
+MAGIC = b"GRIDEVT1"
+
+#: alignment of the data blocks in bytes
+ALIGN = 64
+
+
+def _native(array):
+    """View or copy an array in native byte order"""
+    array = np.asarray(array).view(np.ndarray)
+    return array.astype(array.dtype.newbyteorder("="), copy=False)
+
+
+def write_cache(path, arrays, meta=None):
+    """Write arrays to a memory-mappable cache file
+
+    The file starts with ``MAGIC`` and the byte offset of a JSON footer. Each
+    array is stored in native byte order in its own block aligned to
+    ``ALIGN`` bytes, the footer describes the blocks and holds ``meta``.
+
+    Parameters
+    ----------
+    path: str
+        The path of the cache file
+    arrays: dict
+        The arrays to store by name
+    meta: dict, optional
+        Additional JSON-serializable information
+    """
+    blocks = {}
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", 0))
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(_native(array))
+            f.write(b"\0" * (-f.tell() % ALIGN))
+            blocks[name] = {
+                "offset": f.tell(),
+                "dtype": np.lib.format.dtype_to_descr(array.dtype),
+                "shape": array.shape,
+            }
+            f.write(array.tobytes())
+
+        footer = f.tell()
+        f.write(json.dumps({"blocks": blocks, "meta": meta or {}}).encode())
+        f.seek(len(MAGIC))
+        f.write(struct.pack("<Q", footer))
+
+
+def read_cache(path):
+    """Memory-map the arrays of a cache file
+
+    Parameters
+    ----------
+    path: str
+        The path of the cache file
+
+    Returns
+    -------
+    : dict
+        The read-only memory-mapped arrays by name
+    : dict
+        The additional information stored with the arrays
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a GRID cache file".format(path))
+        (footer,) = struct.unpack("<Q", f.read(8))
+        f.seek(footer)
+        content = json.loads(f.read().decode())
+
+    arrays = {}
+    for name, block in content["blocks"].items():
+        dtype = np.lib.format.descr_to_dtype(block["dtype"])
+        shape = tuple(block["shape"])
+        if np.prod(shape) == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode="r", offset=block["offset"], shape=shape
+            )
+
+    return arrays, content["meta"]
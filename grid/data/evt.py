@@ -1,11 +1,574 @@
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 from astropy.io import fits
 
 from gbm.data import TTE, Cspec
 from gbm.data import headers as hdr
-from gbm.data.primitives import EventList
+from gbm.data.primitives import EventList, TimeBins, TimeEnergyBins
 
 from ..detector import Detector
+from ..utils.utils import binary_search
+from .cache import read_cache, write_cache
+from .index import TimeIndex
+from .ticks import TICK_RESOLUTION, TickTimes
+
+#: names of the event extensions, one per sub-detector
+EVENTS_EXTNAMES = ("EVENTS0", "EVENTS1", "EVENTS2", "EVENTS3")
+
+#: layout of the event table handed to :class:`~gbm.data.primitives.EventList`,
+#: SUBDET is the index of the EVENTS extension the event was read from
+EVENT_DTYPE = [
+    ("TIME", ">f8"),
+    ("PHA", ">i2"),
+    ("SUBDET", "u1"),
+    ("DEAD_TIME", "u1"),
+    ("EVT_TYPE", "u1"),
+]
+
+#: position of the columns read from the EVENTS extensions, which are laid
+#: out as TIME, PHA, DEAD_TIME, EVT_TYPE
+EVENT_COLUMNS = {"TIME": 0, "PHA": 1, "DEAD_TIME": 2, "EVT_TYPE": 3}
+
+#: width of the buckets of the time index of the events in seconds
+INDEX_RESOLUTION = 1.0
+
+#: number of channel selections whose prefix sums :meth:`Evt.count` keeps
+PREFIX_CACHE_SIZE = 2
+
+#: dead time in seconds of an event of the overflow (last) channel when the
+#: events have no DEAD_TIME, as :meth:`gbm.data.primitives.EventList.bin`
+OVERFLOW_DEADTIME = 1e-5
+
+
+def _time_window(time, time_range):
+    """Row range of a time-ordered column inside a time range
+
+    The column is bisected element by element, so only a few pages of a
+    memory-mapped column are touched.
+
+    Parameters
+    ----------
+    time: np.array
+        The time-ordered TIME column
+    time_range: (float, float)
+        The time range, both ends included
+
+    Returns
+    -------
+    : (int, int)
+        The first row inside and the first row after the time range
+    """
+    if len(time) == 0:
+        return 0, 0
+    tstart, tstop = time_range
+    start = binary_search(time, tstart)
+    stop = binary_search(time, np.nextafter(tstop, np.inf))
+    return start, stop
+
+
+def _chunk_end(time, boundary, start, cap):
+    """First row of a chunk boundary in the remaining rows of a TIME column
+
+    Parameters
+    ----------
+    time: np.array
+        The time-ordered TIME column
+    boundary: float
+        The time where the chunk ends
+    start: int
+        The first remaining row
+    cap: int
+        The last row the chunk may end at
+
+    Returns
+    -------
+    : int
+        The first row at or after the boundary, between ``start`` and ``cap``
+    """
+    if start >= cap:
+        # an empty or exhausted extension
+        return start
+    return min(max(binary_search(time, boundary), start), cap)
+
+
+def _merge_pair(a, b):
+    """Merge two time-ordered runs, ties keep the events of ``a`` first
+
+    Parameters
+    ----------
+    a, b: (np.array, np.array)
+        The times and row indices of each run
+
+    Returns
+    -------
+    : (np.array, np.array)
+        The times and row indices of the merged run
+    """
+    (time_a, index_a), (time_b, index_b) = a, b
+    size = time_a.size + time_b.size
+
+    # position of each event of b in the merged run
+    pos = np.searchsorted(time_a, time_b, side="right")
+    pos += np.arange(time_b.size)
+    from_a = np.ones(size, dtype=bool)
+    from_a[pos] = False
+
+    time = np.empty(size, dtype=time_a.dtype)
+    time[pos] = time_b
+    time[from_a] = time_a
+    index = np.empty(size, dtype=index_a.dtype)
+    index[pos] = index_b
+    index[from_a] = index_a
+    return time, index
+
+
+def _merge_runs(runs):
+    """k-way merge of time-ordered runs
+
+    The runs are merged pairwise in a tree of log2(k) levels, every level is
+    a linear pass, so the merge costs O(n log k) instead of a full sort.
+
+    Parameters
+    ----------
+    runs: list of np.array
+        The times of each run, each run is time-ordered
+
+    Returns
+    -------
+    : (np.array, np.array)
+        The merged times and the indices of the merged events in the
+        concatenation of the runs
+    """
+    merged = []
+    offset = 0
+    for time in runs:
+        time = np.asarray(time, dtype=np.float64)
+        index = np.arange(offset, offset + time.size)
+        if np.any(time[1:] < time[:-1]):
+            # out of order run, should not happen for a valid file
+            order = np.argsort(time, kind="stable")
+            time, index = time[order], index[order]
+        merged.append((time, index))
+        offset += time.size
+
+    if not merged:
+        return np.empty(0), np.empty(0, dtype=np.intp)
+
+    while len(merged) > 1:
+        pairs = [
+            _merge_pair(merged[i], merged[i + 1]) for i in range(0, len(merged) - 1, 2)
+        ]
+        if len(merged) % 2:
+            pairs.append(merged[-1])
+        merged = pairs
+
+    return merged[0]
+
+
+def _assemble_events(extensions, time_range=None, windows=None):
+    """Assemble the time-ordered event table of several EVENTS extensions
+
+    Each extension is time-ordered, they are k-way merged into one
+    preallocated buffer, so no per-event Python work or general-purpose
+    sort is involved.
+
+    Parameters
+    ----------
+    extensions: list of :class:`~astropy.io.fits.FITS_rec`
+        The data of the EVENTS extensions
+    time_range: (float, float), optional
+        Only read the rows inside the time range. If omitted, reads all rows.
+    windows: list of (int, int), optional
+        The row range to read of each extension, overrides ``time_range``
+
+    Returns
+    -------
+    : np.ndarray
+        The structured event array with the fields of ``EVENT_DTYPE``
+    """
+    time_col = EVENT_COLUMNS["TIME"]
+    if windows is None and time_range is None:
+        windows = [(0, len(data)) for data in extensions]
+    elif windows is None:
+        windows = [
+            _time_window(data.field(time_col), time_range) for data in extensions
+        ]
+
+    columns = {
+        name: [
+            data.field(col)[start:stop]
+            for data, (start, stop) in zip(extensions, windows)
+        ]
+        for name, col in EVENT_COLUMNS.items()
+    }
+
+    time, order = _merge_runs(columns.pop("TIME"))
+    events = np.empty(time.size, dtype=EVENT_DTYPE)
+    events["TIME"] = time
+    for name, runs in columns.items():
+        events[name] = np.concatenate(runs)[order]
+
+    sizes = [stop - start for start, stop in windows]
+    events["SUBDET"] = np.repeat(np.arange(len(extensions), dtype="u1"), sizes)[order]
+
+    return events
+
+
+def _read_eventlist(filename, ebounds, time_range=None):
+    """Read the events of a Evt FITS file through a memory map
+
+    Parameters
+    ----------
+    filename: str
+        The filename of the FITS file
+    ebounds: :class:`~astropy.io.fits.FITS_rec`
+        The EBOUNDS data of the file
+    time_range: (float, float), optional
+        Only read the events inside the time range. If omitted, reads all events.
+
+    Returns
+    -------
+    : :class:`~gbm.data.primitives.EventList`
+        The event list
+    """
+    with fits.open(filename, mmap=True) as hdul:
+        events = _assemble_events(
+            [hdul[name].data for name in EVENTS_EXTNAMES], time_range=time_range
+        )
+    return EventList.from_fits_array(events, ebounds)
+
+
+def _read_file(filename, time_range=None, events=True):
+    """Read the content of a Evt FITS file
+
+    Parameters
+    ----------
+    filename: str
+        The filename of the FITS file
+    time_range: (float, float), optional
+        Only read the events inside the time range. If omitted, reads all events.
+    events: bool, optional
+        If False, the EVENTS extensions are not read, by default True
+
+    Returns
+    -------
+    : list of (str, :class:`~astropy.io.fits.Header`)
+        The name and header of each HDU
+    : :class:`~astropy.io.fits.FITS_rec`
+        The EBOUNDS data
+    : np.array
+        The GTI
+    : np.ndarray or None
+        The structured event array, None if ``events`` is False
+    """
+    with fits.open(filename, mmap=True) as hdul:
+        headers = [(hdu.name, hdu.header) for hdu in hdul]
+
+        # copy out of the memory map, it is released on close
+        ebounds = hdul["EBOUNDS"].data.copy()
+
+        # Do this for GTI as well
+        gti = hdul["GTI"].data
+        gti = np.vstack((gti["START"], gti["STOP"])).squeeze().T
+
+        if events:
+            events = _assemble_events(
+                [hdul[name].data for name in EVENTS_EXTNAMES], time_range=time_range
+            )
+        else:
+            events = None
+
+    return headers, ebounds, gti, events
+
+
+def _bin_index(time, edges):
+    """Bin index of time-ordered events, the last edge belongs to the last bin
+
+    The events inside the edges are a row range found by bisection. Uniform
+    edges are resolved with integer arithmetic on the bin width, other edges
+    with a bisection.
+
+    Parameters
+    ----------
+    time: np.array
+        The time-ordered event times
+    edges: np.array
+        The bin edges
+
+    Returns
+    -------
+    : np.array
+        The bin index of each event inside the edges
+    : int
+        The first row inside the edges
+    """
+    start = np.searchsorted(time, edges[0], side="left")
+    stop = np.searchsorted(time, edges[-1], side="right")
+    time = time[start:stop]
+    nbins = edges.size - 1
+    if nbins < 1:
+        return np.zeros(0, dtype=np.intp), start
+
+    width = (edges[-1] - edges[0]) / nbins
+    grid = edges[0] + width * np.arange(edges.size)
+    if width > 0.0 and np.all(np.abs(edges - grid) < 0.5 * width):
+        index = np.floor((time - edges[0]) / width)
+        np.clip(index, 0, nbins - 1, out=index)
+        index = index.astype(np.intp)
+        # move the events next to a rounded edge to their bin
+        index -= time < edges[index]
+        index += time >= edges[index + 1]
+    else:
+        index = np.searchsorted(edges, time, side="right") - 1
+    # the events on the last edge are the last rows
+    index[np.searchsorted(time, edges[-1], side="left") :] = nbins - 1
+    return index, start
+
+
+def _channel_table(numchans, lut=None):
+    """Lookup table of the column of each channel for :func:`_lookup`
+
+    Parameters
+    ----------
+    numchans: int
+        The number of channels
+    lut: np.array, optional
+        The column of each channel, -1 for channels that are not counted.
+        If omitted, every channel is its own column and, as for
+        :func:`numpy.histogram2d` with the channel edges 0..numchans, channel
+        numchans falls into the last channel.
+
+    Returns
+    -------
+    : np.array
+        The column of each channel, followed by the column of channel
+        numchans and -1 for the channels outside
+    """
+    if lut is None:
+        return np.append(np.arange(numchans), [numchans - 1, -1])
+    return np.append(lut, [-1, -1]).astype(np.intp)
+
+
+def _lookup(pha, table):
+    """Column of each event from a lookup table of the channels
+
+    Parameters
+    ----------
+    pha: np.array
+        The event channels
+    table: np.array
+        The lookup table from :func:`_channel_table`
+
+    Returns
+    -------
+    : np.array
+        The column of each event, -1 for events that are not counted
+    """
+    return np.take(table, np.clip(pha, -1, table.size - 1))
+
+
+def _extend(column, rows, new_rows, compute):
+    """Column of a new row range from the column of another row range
+
+    Only the rows of the new range that are outside the other range are
+    computed.
+
+    Parameters
+    ----------
+    column: np.array
+        The column of the rows ``rows``
+    rows, new_rows: (int, int)
+        The row ranges
+    compute: <function>
+        Computes the column of a row range, ``compute(start, stop)``
+
+    Returns
+    -------
+    : np.array
+        The column of the rows ``new_rows``
+    """
+    (start, stop), (new_start, new_stop) = rows, new_rows
+    lo, hi = max(start, new_start), min(stop, new_stop)
+    if lo >= hi:
+        return compute(new_start, new_stop)
+    parts = [column[lo - start : hi - start]]
+    if new_start < lo:
+        parts.insert(0, compute(new_start, lo))
+    if hi < new_stop:
+        parts.append(compute(hi, new_stop))
+    return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+
+def _histogram(index, columns, nbins, numcols):
+    """Time-column histogram of binned events with one bincount
+
+    Parameters
+    ----------
+    index: np.array
+        The bin index of each event
+    columns: np.array
+        The column of each event
+    nbins: int
+        The number of time bins
+    numcols: int
+        The number of columns
+
+    Returns
+    -------
+    : np.array
+        The counts of each time bin and column
+    """
+    counts = np.bincount(index * numcols + columns, minlength=nbins * numcols)
+    return counts.reshape(nbins, numcols).astype(np.float64)
+
+
+def _bin_events(events, time, columns, edges, numcols, time_range, num_subdet=None):
+    """Bin events in time and channel in one pass
+
+    The events are time-ordered, so the events inside the time range and
+    the events of each bin are row ranges: only the counted events are
+    binned, and the dead time of each bin is a sum over its rows.
+
+    Parameters
+    ----------
+    events: np.ndarray
+        The structured event array
+    time: np.array
+        The native float64 TIME of the events
+    columns: np.array
+        The column of each event from :func:`_lookup`
+    edges: np.array
+        The time edges
+    numcols: int
+        The number of columns
+    time_range: (float, float)
+        Only count the events inside the time range
+    num_subdet: int, optional
+        If set, the events of each sub-detector are counted separately, the
+        SUBDET of an event is the leading component of its bincount index
+
+    Returns
+    -------
+    : np.array
+        The counts of each time bin and column, with a leading sub-detector
+        axis if ``num_subdet`` is set
+    : np.array or None
+        The dead time of each time bin, counting the events of all
+        channels, None if the events have no DEAD_TIME
+    """
+    if np.any(time[1:] < time[:-1]):
+        # the events of an EventList that is not time-ordered
+        order = np.argsort(time, kind="stable")
+        events, time, columns = events[order], time[order], columns[order]
+    nbins = edges.size - 1
+    has_dead_time = "DEAD_TIME" in events.dtype.names
+    first = np.searchsorted(time, time_range[0], side="left")
+    last = np.searchsorted(time, time_range[1], side="right")
+
+    if num_subdet is None or "SUBDET" not in events.dtype.names:
+        # only the counted events inside the time range are binned
+        counted_time, counted = time[first:last], columns[first:last]
+        keep = counted >= 0
+        if not keep.all():
+            counted_time, counted = counted_time[keep], counted[keep]
+        index, start = _bin_index(counted_time, edges)
+        counts = _histogram(index, counted[start : start + index.size], nbins, numcols)
+
+        dead_time = None
+        if has_dead_time:
+            rows = np.searchsorted(time, edges, side="left")
+            rows[-1] = np.searchsorted(time, edges[-1], side="right")
+            dead_time = np.zeros(nbins)
+            full = rows[1:] > rows[:-1]
+            if full.any():
+                # the events of a bin are the rows between its edges
+                sums = np.add.reduceat(
+                    events["DEAD_TIME"][: rows[-1]], rows[:-1][full], dtype=np.int64
+                )
+                dead_time[full] = sums
+
+        if num_subdet is not None:
+            # events without SUBDET all belong to the first sub-detector
+            counts = np.concatenate(
+                (counts[None], np.zeros((num_subdet - 1, nbins, numcols)))
+            )
+            if dead_time is not None:
+                dead_time = np.vstack((dead_time, np.zeros((num_subdet - 1, nbins))))
+        return counts, dead_time
+
+    # the SUBDET of an event is the leading component of its bin index
+    index, start = _bin_index(time, edges)
+    stop = start + index.size
+    index += events["SUBDET"][start:stop].astype(np.intp) * nbins
+    lo = max(first, start)
+    hi = max(min(last, stop), lo)
+    counted_index, counted = index[lo - start : hi - start], columns[lo:hi]
+    keep = counted >= 0
+    if not keep.all():
+        counted_index, counted = counted_index[keep], counted[keep]
+    counts = _histogram(counted_index, counted, num_subdet * nbins, numcols)
+    counts = counts.reshape(num_subdet, nbins, numcols)
+
+    dead_time = None
+    if has_dead_time:
+        dead_time = np.bincount(
+            index, weights=events["DEAD_TIME"][start:stop], minlength=num_subdet * nbins
+        )
+        dead_time = dead_time.reshape(num_subdet, nbins)
+    return counts, dead_time
+
+
+def _cache_eventlist(columns, ebounds, rows=None):
+    """Assemble the events of a cache file
+
+    Parameters
+    ----------
+    columns: dict
+        The memory-mapped event columns by name
+    ebounds: np.ndarray
+        The EBOUNDS data
+    rows: (int, int), optional
+        Only read the rows inside the range. If omitted, reads all rows.
+
+    Returns
+    -------
+    : :class:`~gbm.data.primitives.EventList`
+        The event list
+    """
+    start, stop = (0, len(columns["TIME"])) if rows is None else rows
+    events = np.empty(
+        stop - start, dtype=[(name, column.dtype) for name, column in columns.items()]
+    )
+    for name, column in columns.items():
+        events[name] = column[start:stop]
+    return EventList.from_fits_array(events, ebounds)
+
+
+def _merge_gti(gtis):
+    """Union of several lists of good time intervals
+
+    Parameters
+    ----------
+    gtis: list of np.array
+        The GTI of each file
+
+    Returns
+    -------
+    : np.array
+        The merged GTI, sorted and without overlaps
+    """
+    gti = np.vstack([np.reshape(one_gti, (-1, 2)) for one_gti in gtis])
+    gti = gti[np.argsort(gti[:, 0], kind="stable")]
+
+    # a new interval starts where its start is past all previous stops
+    stops = np.maximum.accumulate(gti[:, 1])
+    new = np.ones(len(gti), dtype=bool)
+    new[1:] = gti[1:, 0] > stops[:-1]
+    last = np.append(np.flatnonzero(new)[1:] - 1, len(gti) - 1)
+
+    return np.vstack((gti[new, 0], stops[last])).squeeze().T
 
 
 class Evt(TTE):
@@ -17,13 +580,52 @@ class Evt(TTE):
         detector: :class:`~grid.detector.Detector`
             detector to plot the pointing on the sky
         """
+        self._loader = None
+        self._eventlist = None
+        self._index = None
+        self._index_offsets = None
+        self._prefix = {}
         super().__init__()
         self._detector = d
 
+    @property
+    def _data(self):
+        # the events of a lazily opened file are read on first access
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            self._eventlist = loader()
+        return self._eventlist
+
+    @_data.setter
+    def _data(self, data):
+        self._loader = None
+        self._eventlist = data
+        # the time index and prefix sums belong to the previous events
+        self._index = None
+        self._index_offsets = None
+        self._prefix = {}
+
     @property
     def detector(self):
         return self._detector
 
+    @property
+    def is_loaded(self):
+        """(bool): True if the event data are in memory"""
+        return self._loader is None
+
+    @property
+    def time_index(self):
+        """(:class:`~grid.data.index.TimeIndex`): The coarse time index of the
+        events, built on first use"""
+        if self._index is None:
+            time = self._data._events["TIME"]
+            if self._index_offsets is None:
+                self._index = TimeIndex(time, INDEX_RESOLUTION)
+            else:
+                self._index = TimeIndex.from_offsets(time, *self._index_offsets)
+        return self._index
+
     @property
     def energy_range(self):
         data = self._data
@@ -72,6 +674,11 @@ class Evt(TTE):
         """
         obj = cls(detector)
         filetype = "GBM PHOTON LIST"
+        time = data._events["TIME"]
+        if np.any(time[1:] < time[:-1]):
+            # the time index and the binning bisect time-ordered events
+            order = np.argsort(time, kind="stable")
+            data = EventList.from_fits_array(data._events[order], data._ebounds)
         obj._data = data
         detchans = data.numchans
         tstart, tstop = data.time_range
@@ -175,7 +782,7 @@ class Evt(TTE):
         return obj
 
     @classmethod
-    def open(cls, filename, d: Detector):
+    def open(cls, filename, d: Detector, lazy=False, time_range=None):
         """Open a Evt FITS file and return the Evt object
 
         Parameters
@@ -184,6 +791,15 @@ class Evt(TTE):
             The filename of the FITS file
         detector: :class:`~grid.detector.Detector`
             detector to plot the pointing on the sky
+        lazy: bool, optional
+            If True, only the headers, EBOUNDS and GTI are read and the
+            memory-mapped EVENTS extensions are loaded on first use of the
+            event data, by default False
+        time_range: (float, float), optional
+            Only read the events inside the time range. Each EVENTS extension
+            is time-ordered and bisected, so only the matching rows are read.
+            The headers and GTI still describe the whole file.
+            If omitted, reads all events.
 
         Returns
         -------
@@ -192,41 +808,360 @@ class Evt(TTE):
         """
         obj = cls(d)
         obj._file_properties(filename)
+        if time_range is not None:
+            time_range = obj._assert_range(time_range)
 
-        with fits.open(filename, mmap=False) as hdul:
-            for hdu in hdul:
-                obj._headers.update({hdu.name: hdu.header})
+        headers, ebounds, gti, events = _read_file(
+            filename, time_range=time_range, events=not lazy
+        )
+        obj._headers.update(headers)
+        obj._headers["PRIMARY"]["TRIGTIME"] = 0.0
 
-            obj._headers["PRIMARY"]["TRIGTIME"] = 0.0
+        # create the EventList, the core of the Evt class
+        if lazy:
+            obj._loader = partial(
+                _read_eventlist, filename, ebounds, time_range=time_range
+            )
+        else:
+            obj._data = EventList.from_fits_array(events, ebounds)
+        obj._gti = gti
 
-            EVENTS0 = hdul["EVENTS0"].data.view(np.recarray)
-            EVENTS1 = hdul["EVENTS1"].data.view(np.recarray)
-            EVENTS2 = hdul["EVENTS2"].data.view(np.recarray)
-            EVENTS3 = hdul["EVENTS3"].data.view(np.recarray)
+        return obj
 
-            ebounds = hdul["EBOUNDS"].data
-            events = np.hstack((EVENTS0, EVENTS1, EVENTS2, EVENTS3))
-            events.dtype = [
-                ("TIME", ">f8"),
-                ("PHA", ">i2"),
-                ("DEAD_TIME", "u1"),
-                ("EVT_TYPE", "u1"),
-            ]
-            events = np.array(
-                list(zip(events["TIME"], events["PHA"])),
-                dtype=[("TIME", ">f8"), ("PHA", ">i2")],
-            )
+    @classmethod
+    def open_many(cls, filenames, d: Detector, workers=None, time_range=None):
+        """Open several consecutive Evt FITS files as one Evt object
 
-            # Do this for GTI as well
-            gti = hdul["GTI"].data
-            gti = np.vstack((gti["START"], gti["STOP"])).squeeze().T
+        The files are decoded in parallel worker processes and stitched in
+        time order. Events of a file that fall inside the time span already
+        covered by an earlier file are dropped as duplicates, and the GTI
+        are merged.
 
-            # create the EventList, the core of the Evt class
-            obj._data = EventList.from_fits_array(events, ebounds)
-            obj._gti = gti
+        Parameters
+        ----------
+        filenames: list of str
+            The filenames of the FITS files
+        detector: :class:`~grid.detector.Detector`
+            detector to plot the pointing on the sky
+        workers: int, optional
+            The number of worker processes. If 1, the files are read serially.
+            If omitted, uses one process per CPU.
+        time_range: (float, float), optional
+            Only read the events inside the time range. If omitted, reads all events.
+
+        Returns
+        -------
+        : :class:`Evt`
+            The Evt object, its headers are the ones of the first file
+        """
+        filenames = list(filenames)
+        if not filenames:
+            raise ValueError("filenames must not be empty")
+
+        obj = cls(d)
+        obj._file_properties(filenames[0])
+        if time_range is not None:
+            time_range = obj._assert_range(time_range)
+
+        reader = partial(_read_file, time_range=time_range)
+        if workers == 1 or len(filenames) == 1:
+            parts = list(map(reader, filenames))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(reader, filenames))
+
+        # stitch the files in time order
+        parts.sort(key=lambda part: np.min(part[2]))
+        headers = [dict(part[0]) for part in parts]
+        kept = []
+        tlast = -np.inf
+        for _, _, _, events in parts:
+            # drop the events of the time span covered by the earlier files
+            time = events["TIME"]
+            start = binary_search(time, np.nextafter(tlast, np.inf)) if time.size else 0
+            if start < time.size:
+                kept.append(events[start:])
+                tlast = time[-1]
+
+        obj._headers.update(headers[0])
+        obj._headers["PRIMARY"]["TRIGTIME"] = 0.0
+        if "TSTOP" in headers[-1]["PRIMARY"]:
+            obj._headers["PRIMARY"]["TSTOP"] = headers[-1]["PRIMARY"]["TSTOP"]
+
+        ebounds, events = parts[0][1], parts[0][3]
+        if kept:
+            events = np.concatenate(kept)
+        obj._data = EventList.from_fits_array(events, ebounds)
+        obj._gti = _merge_gti([part[2] for part in parts])
 
         return obj
 
+    @classmethod
+    def iter_chunks(
+        cls,
+        filename,
+        d: Detector,
+        chunk_events=None,
+        chunk_seconds=None,
+        time_range=None,
+    ):
+        """Read a Evt FITS file as a stream of time-ordered event chunks
+
+        The EVENTS extensions are memory-mapped and only one chunk is in
+        memory at a time, so files larger than the memory can be processed.
+        Exactly one of ``chunk_events`` and ``chunk_seconds`` must be given.
+
+        Parameters
+        ----------
+        filename: str
+            The filename of the FITS file
+        detector: :class:`~grid.detector.Detector`
+            detector to plot the pointing on the sky
+        chunk_events: int, optional
+            The number of events of each chunk. A chunk only exceeds it when
+            more events share the same time.
+        chunk_seconds: float, optional
+            The duration of each chunk in seconds, the chunks are aligned to
+            the first event and empty chunks are skipped
+        time_range: (float, float), optional
+            Only read the events inside the time range. If omitted, reads all events.
+
+        Yields
+        ------
+        : :class:`~gbm.data.primitives.EventList`
+            The event list of each chunk
+        """
+        if (chunk_events is None) == (chunk_seconds is None):
+            raise ValueError("Exactly one of chunk_events or chunk_seconds must be set")
+        if chunk_events is not None and chunk_events < 1:
+            raise ValueError("chunk_events must be positive")
+        if chunk_seconds is not None and chunk_seconds <= 0.0:
+            raise ValueError("chunk_seconds must be positive")
+
+        with fits.open(filename, mmap=True) as hdul:
+            ebounds = hdul["EBOUNDS"].data.copy()
+            extensions = [hdul[name].data for name in EVENTS_EXTNAMES]
+            times = [data.field(EVENT_COLUMNS["TIME"]) for data in extensions]
+            if time_range is None:
+                windows = [(0, len(time)) for time in times]
+            else:
+                windows = [_time_window(time, sorted(time_range)) for time in times]
+            starts = [start for start, _ in windows]
+            stops = [stop for _, stop in windows]
+
+            tstart = None
+            while any(start < stop for start, stop in zip(starts, stops)):
+                if chunk_seconds is not None:
+                    tnext = min(
+                        time[start]
+                        for time, start, stop in zip(times, starts, stops)
+                        if start < stop
+                    )
+                    tstart = tnext if tstart is None else tstart
+                    num = np.floor((tnext - tstart) / chunk_seconds) + 1
+                    boundary = tstart + num * chunk_seconds
+                    caps = stops
+                else:
+                    # the chunk ends at the first time past chunk_events events
+                    caps = [
+                        min(start + chunk_events, stop)
+                        for start, stop in zip(starts, stops)
+                    ]
+                    heads, _ = _merge_runs(
+                        [
+                            time[start:cap]
+                            for time, start, cap in zip(times, starts, caps)
+                        ]
+                    )
+                    boundary = (
+                        heads[chunk_events] if heads.size > chunk_events else np.inf
+                    )
+
+                ends = [
+                    _chunk_end(time, boundary, start, cap)
+                    for time, start, cap in zip(times, starts, caps)
+                ]
+                if ends == starts:
+                    # more than chunk_events events share the boundary time
+                    boundary = np.nextafter(boundary, np.inf)
+                    ends = [
+                        _chunk_end(time, boundary, start, cap)
+                        for time, start, cap in zip(times, starts, caps)
+                    ]
+
+                events = _assemble_events(extensions, windows=list(zip(starts, ends)))
+                yield EventList.from_fits_array(events, ebounds)
+                starts = ends
+
+    @classmethod
+    def from_cache(cls, path, d: Detector, lazy=False, time_range=None):
+        """Open a cache file written by :meth:`to_cache` and return the Evt object
+
+        The event columns are memory-mapped, so no FITS parsing or byte
+        swapping is involved.
+
+        Parameters
+        ----------
+        path: str
+            The path of the cache file
+        detector: :class:`~grid.detector.Detector`
+            detector to plot the pointing on the sky
+        lazy: bool, optional
+            If True, the events are loaded on first use of the event data,
+            by default False
+        time_range: (float, float), optional
+            Only read the events inside the time range, the rows are found
+            through the time index of the cache. If omitted, reads all events.
+
+        Returns
+        -------
+        : :class:`Evt`
+            The Evt object
+        """
+        obj = cls(d)
+        obj._file_properties(path)
+
+        arrays, meta = read_cache(path)
+        for name, header in meta["headers"]:
+            obj._headers.update({name: fits.Header.fromstring(header)})
+        obj._gti = np.array(arrays["GTI"])
+        ebounds = np.array(arrays["EBOUNDS"])
+        columns = {name: arrays[name] for name in meta["columns"]}
+
+        tstart, resolution = meta["index"]["tstart"], meta["index"]["resolution"]
+        offsets = np.array(arrays["INDEX"], dtype=np.intp)
+        rows = (0, len(columns["TIME"]))
+        if time_range is not None:
+            index = TimeIndex.from_offsets(columns["TIME"], tstart, resolution, offsets)
+            rows = index.rows(*obj._assert_range(time_range))
+
+        loader = partial(_cache_eventlist, columns, ebounds, rows=rows)
+        if lazy:
+            obj._loader = loader
+        else:
+            obj._data = loader()
+
+        # the time index of the cache, shifted to the rows that were read
+        offsets = np.clip(offsets - rows[0], 0, rows[1] - rows[0])
+        obj._index_offsets = (tstart, resolution, offsets)
+
+        return obj
+
+    def to_cache(self, path, resolution=1.0):
+        """Write the decoded data to a memory-mappable cache file
+
+        The event columns are stored in native byte order together with the
+        EBOUNDS, GTI, headers and a coarse time index. Reopen the file with
+        :meth:`from_cache`.
+
+        Parameters
+        ----------
+        path: str
+            The path of the cache file
+        resolution: float, optional
+            The width of the time index buckets in seconds, by default 1
+        """
+        events = self._data._events
+        index = self.time_index
+        if index.resolution != resolution:
+            index = TimeIndex(events["TIME"], resolution)
+
+        arrays = {name: events[name] for name in events.dtype.names}
+        arrays.update(
+            {"EBOUNDS": self._data._ebounds, "GTI": self._gti, "INDEX": index.offsets}
+        )
+        meta = {
+            "columns": list(events.dtype.names),
+            "headers": [
+                [name, header.tostring()] for name, header in self._headers.items()
+            ],
+            "index": {"tstart": index.tstart, "resolution": index.resolution},
+        }
+        write_cache(path, arrays, meta)
+
+    def time_slice(self, tstart, tstop):
+        """The events inside a time range
+
+        The rows of the time range are found through the time index, and the
+        events are a view of the loaded events, not a copy.
+
+        Parameters
+        ----------
+        tstart, tstop: float
+            The time range, both ends included
+
+        Returns
+        -------
+        : :class:`~gbm.data.primitives.EventList`
+            The events inside the time range
+        """
+        start, stop = self.time_index.rows(tstart, tstop)
+        data = self._data
+        return EventList.from_fits_array(data._events[start:stop], data._ebounds)
+
+    def to_ticks(self, resolution=TICK_RESOLUTION):
+        """The event times as integer clock ticks
+
+        Parameters
+        ----------
+        resolution: float, optional
+            The duration of a tick in seconds, by default ``TICK_RESOLUTION``
+
+        Returns
+        -------
+        : :class:`~grid.data.ticks.TickTimes`
+            The event times, rounded to the nearest tick
+        """
+        return TickTimes.from_seconds(self._data._events["TIME"], resolution)
+
+    def count(self, tstart, tstop, energy_range=None, channel_range=None):
+        """The number of events inside one or many time windows
+
+        The counts come from the rows of the window ends found through the
+        time index, or from a prefix sum of the selected channels for energy
+        and channel cuts, so no window is materialized. The prefix sums of
+        the last ``PREFIX_CACHE_SIZE`` selections are kept.
+
+        Parameters
+        ----------
+        tstart, tstop: float or np.array
+            The time windows, both ends included
+        energy_range: (float, float), optional
+            Only count the events inside the energy range
+        channel_range: (int, int), optional
+            Only count the events inside the channel range
+
+        Returns
+        -------
+        : int or np.array
+            The number of events inside each window
+        """
+        start, stop = self.time_index.rows(tstart, tstop)
+        stop = np.maximum(start, stop)
+        if (channel_range is None) and (energy_range is None):
+            return stop - start
+
+        data = self._data
+        if channel_range is not None:
+            self._assert_range(channel_range)
+            energy_range = (data.emin[channel_range[0]], data.emax[channel_range[1]])
+        emin, emax = self._assert_range(energy_range)
+        channels = (data.emax > emin) & (data.emin < emax)
+
+        # the prefix sums of the last selections of channels are kept for reuse
+        key = channels.tobytes()
+        if key in self._prefix:
+            prefix = self._prefix.pop(key)
+        else:
+            mask = channels[np.clip(data._events["PHA"], 0, data.numchans - 1)]
+            dtype = np.uint32 if mask.size < 2**32 else np.int64
+            prefix = np.zeros(mask.size + 1, dtype=dtype)
+            np.cumsum(mask, out=prefix[1:])
+            while len(self._prefix) >= PREFIX_CACHE_SIZE:
+                self._prefix.pop(next(iter(self._prefix)))
+        self._prefix[key] = prefix
+        return prefix[stop].astype(np.int64) - prefix[start]
+
     def to_phaii(
         self,
         bin_method,
@@ -234,10 +1169,22 @@ class Evt(TTE):
         time_range=None,
         energy_range=None,
         channel_range=None,
+        workers=None,
+        per_subdet=False,
         **kwargs
     ):
         """Utilizing a binning function, convert the data to a PHAII object
 
+        The binning function only provides the time edges, the events are
+        then binned in one pass: the time bin follows from integer arithmetic
+        for uniform edges, energy and channel cuts are masks, and the counts
+        come from a single bincount, so no event is copied.
+
+        The exposure of each bin is computed from the DEAD_TIME of every event
+        in the bin, in units of ``detector.deadtime_unit``. Events without a
+        DEAD_TIME use the scalar ``detector.deadtime``, and
+        ``OVERFLOW_DEADTIME`` for the overflow channel.
+
         Parameters
         ----------
         bin_method: <function>
@@ -248,40 +1195,249 @@ class Evt(TTE):
             The energy range of the spectrum. If omitted, uses the entireenergy range of the data.
         channel_range: (int, int), optional
             The channel range of the spectrum. If omitted, uses the entireenergy range of the data.
+        workers: int, optional
+            If set, the events are split in up to ``workers`` contiguous row
+            ranges binned in threads, and the counts are summed. The threads
+            only run in parallel where numpy releases the GIL, so this helps
+            on several cores and only adds overhead on a single core.
+        per_subdet: bool, optional
+            If True, returns one PHAII object per sub-detector instead of
+            their sum, by default False
 
         Returns
         -------
-        : class:`Cspec`
-            The PHAII object
+        : class:`Cspec` or list of class:`Cspec`
+            The PHAII object, or the PHAII object of each sub-detector if
+            ``per_subdet`` is True
         """
-        # slice to desired energy or channel range
+        data = self._data
+        numchans = data.numchans
+
+        # energy and channel cuts are a lookup table of the channels
+        lut = None
         if (channel_range is not None) or (energy_range is not None):
             if channel_range is not None:
                 self._assert_range(channel_range)
                 energy_range = (
-                    self._data.emin[channel_range[0]],
-                    self._data.emax[channel_range[1]],
+                    data.emin[channel_range[0]],
+                    data.emax[channel_range[1]],
                 )
-            temp = self._data.energy_slice(*self._assert_range(energy_range))
-        else:
-            temp = self._data
+            emin, emax = self._assert_range(energy_range)
+            channels = (data.emax > emin) & (data.emin < emax)
+            lut = np.where(channels, np.arange(numchans), -1)
+
+        edges, (tstart, tstop), events, time, columns = self._time_edges(
+            bin_method, args, kwargs, time_range=time_range, lut=lut
+        )
 
         # do the time binning to create the TimeEnergyBins
+        binner = partial(
+            _bin_events,
+            edges=edges,
+            numcols=numchans,
+            time_range=(tstart, tstop),
+            num_subdet=len(EVENTS_EXTNAMES) if per_subdet else None,
+        )
+        if workers is None:
+            counts, dead_time = binner(events, time, columns)
+        else:
+            # contiguous row ranges are views, their histograms are summed
+            bounds = np.linspace(0, events.size, max(min(workers, events.size), 1) + 1)
+            bounds = bounds.astype(int)
+            chunks = [
+                (events[start:stop], time[start:stop], columns[start:stop])
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                binned = list(pool.map(lambda chunk: binner(*chunk), chunks))
+            counts = sum(one_counts for one_counts, _ in binned)
+            dead_time = binned[0][1]
+            if dead_time is not None:
+                dead_time = sum(one_dead_time for _, one_dead_time in binned)
+
+        if per_subdet:
+            if dead_time is None:
+                dead_time = [None] * len(counts)
+            binned = list(zip(counts, dead_time))
+        else:
+            binned = [(counts, dead_time)]
+
+        phaiis = []
+        for counts, dead_time in binned:
+            bins = TimeEnergyBins(
+                counts,
+                edges[:-1],
+                edges[1:],
+                self._exposure(edges, counts.sum(axis=1), counts[:, -1], dead_time),
+                data.emin,
+                data.emax,
+            )
+            phaiis.append(self._to_cspec(bins))
+
+        return phaiis if per_subdet else phaiis[0]
+
+    def to_lightcurves(self, bin_method, *args, bands, time_range=None, **kwargs):
+        """Utilizing a binning function, convert the data to the lightcurve
+        of several energy bands in one pass over the events
+
+        Each channel is mapped to its band through a lookup table, so the
+        cost hardly grows with the number of bands. Overlapping bands are
+        supported.
+
+        Parameters
+        ----------
+        bin_method: <function>
+            A binning function
+        bands: [(float, float), ...]
+            The energy range of each band
+        time_range: [(float, float), ...], optional
+            The time range of the lightcurves. If omitted, uses the entire time range of the data.
+
+        Returns
+        -------
+        : list of :class:`~gbm.data.primitives.TimeBins`
+            The lightcurve of each band
+        """
+        data = self._data
+
+        # split the bands into disjoint groups of channels, the overflow
+        # channel is kept in its own group for its dead time
+        membership = np.array(
+            [
+                (data.emax > emin) & (data.emin < emax)
+                for emin, emax in (self._assert_range(band) for band in bands)
+            ]
+        ).T
+        overflow = np.zeros((data.numchans, 1), dtype=bool)
+        overflow[-1] = True
+        groups, lut = np.unique(
+            np.hstack((membership, overflow)), axis=0, return_inverse=True
+        )
+        groups = groups[:, :-1]
+        lut = lut.ravel()
+        lut[~membership.any(axis=1)] = -1
+
+        edges, time_range, events, time, columns = self._time_edges(
+            bin_method, args, kwargs, time_range=time_range, lut=lut
+        )
+        counts, dead_time = _bin_events(
+            events, time, columns, edges, len(groups), time_range
+        )
+        overflow = counts[:, lut[-1]] if lut[-1] >= 0 else 0.0
+        exposure = self._exposure(edges, counts.sum(axis=1), overflow, dead_time)
+        counts = counts @ groups.astype(np.float64)
+
+        return [
+            TimeBins(counts[:, i], edges[:-1], edges[1:], exposure)
+            for i in range(counts.shape[1])
+        ]
+
+    def _time_edges(self, bin_method, args, kwargs, time_range=None, lut=None):
+        """Time edges from a binning function
+
+        The TIME column is converted to native float64 and the channels are
+        looked up once, both are returned for the binning of the events.
+
+        Parameters
+        ----------
+        bin_method: <function>
+            A binning function
+        args: tuple
+            The positional arguments of the binning function
+        kwargs: dict
+            The keyword arguments of the binning function
+        time_range: (float, float), optional
+            The time range of the bins. If omitted, uses the time range of the
+            counted events.
+        lut: np.array, optional
+            The lookup table of the channels, the binning function only sees
+            the events of the counted channels
+
+        Returns
+        -------
+        : np.array
+            The time edges
+        : (float, float)
+            The time range of the bins
+        : np.ndarray
+            The events inside the time edges, a view of the loaded events
+        : np.array
+            The native float64 TIME of these events
+        : np.array
+            The column of these events from :func:`_lookup`
+        """
+        events = self._data._events
+        table = _channel_table(self._data.numchans, lut)
+
+        def read_time(start, stop):
+            return np.asarray(events["TIME"][start:stop], dtype=np.float64)
+
+        def read_columns(start, stop):
+            return _lookup(events["PHA"][start:stop], table)
+
+        # only the rows of the time range are scanned
+        rows = (0, events.size)
+        if time_range is not None:
+            rows = self.time_index.rows(*time_range)
+        time, columns = read_time(*rows), read_columns(*rows)
+
+        counted = time if lut is None else time[columns >= 0]
         if time_range is None:
-            tstart, tstop = None, None
+            tstart, tstop = np.min(counted), np.max(counted)
         else:
             tstart, tstop = time_range
+        edges = bin_method(counted, *args, tstart=tstart, tstop=tstop, **kwargs)
+        edges = np.asarray(edges, dtype=np.float64)
 
-        bins = temp.bin(
-            bin_method,
-            *args,
-            tstart=tstart,
-            tstop=tstop,
-            event_deadtime=self._detector.deadtime,
-            **kwargs
+        # the dead time of all the events inside the bins is counted
+        if time_range is not None:
+            new_rows = self.time_index.rows(edges[0], edges[-1])
+            time = _extend(time, rows, new_rows, read_time)
+            columns = _extend(columns, rows, new_rows, read_columns)
+            events = events[new_rows[0] : new_rows[1]]
+        return edges, (tstart, tstop), events, time, columns
+
+    def _exposure(self, edges, counts, overflow, dead_time=None):
+        """Exposure of each time bin
+
+        Parameters
+        ----------
+        edges: np.array
+            The time edges
+        counts: np.array
+            The counts of each time bin
+        overflow: np.array
+            The counts of the overflow channel of each time bin
+        dead_time: np.array, optional
+            The DEAD_TIME sum of each time bin. If omitted, uses
+            ``detector.deadtime`` for every count and ``OVERFLOW_DEADTIME``
+            for the counts of the overflow channel.
+
+        Returns
+        -------
+        : np.array
+            The exposure of each time bin
+        """
+        widths = np.diff(edges)
+        if dead_time is not None:
+            return widths - dead_time * self._detector.deadtime_unit
+        return widths - (
+            (counts - overflow) * self._detector.deadtime + overflow * OVERFLOW_DEADTIME
         )
 
-        # create the Cspec object
+    def _to_cspec(self, bins):
+        """Create a PHAII object with the properties of the Evt
+
+        Parameters
+        ----------
+        bins: :class:`~gbm.data.primitives.TimeEnergyBins`
+            The binned data
+
+        Returns
+        -------
+        : class:`Cspec`
+            The PHAII object
+        """
         if "OBJECT" in self.headers["PRIMARY"]:
             obj = self.headers["PRIMARY"]["OBJECT"]
             ra_obj = self.headers["PRIMARY"]["RA_OBJ"]
@@ -0,0 +1,152 @@
+import numpy as np
+
+
+class TimeIndex:
+    """Coarse index of a time-ordered array
+
+    The index keeps the row offsets of fixed-width time buckets, so the row
+    of any time is found with one bucket lookup and a bisection inside the
+    bucket instead of a bisection of the whole array.
+
+    Parameters
+    ----------
+    times: np.array
+        The time-ordered times, e.g. the TIME column of an event list. The
+        order is not checked, unordered times give wrong rows.
+    resolution: float, optional
+        The width of the time buckets in seconds, by default 1
+    """
+
+    def __init__(self, times, resolution=1.0):
+        if resolution <= 0.0:
+            raise ValueError("resolution must be positive")
+
+        self._times = times
+        self._resolution = float(resolution)
+        if len(times) > 0:
+            self._tstart = np.floor(times[0] / self._resolution) * self._resolution
+            num_buckets = int((times[-1] - self._tstart) // self._resolution) + 1
+            edges = self._tstart + self._resolution * np.arange(num_buckets + 1)
+            lo = np.zeros(edges.size, dtype=np.intp)
+            hi = np.full(edges.size, len(times), dtype=np.intp)
+            self._offsets = self._bisect(edges, lo, hi, "left")
+        else:
+            self._tstart = 0.0
+            self._offsets = np.zeros(1, dtype=np.intp)
+
+    @classmethod
+    def from_offsets(cls, times, tstart, resolution, offsets):
+        """Create a TimeIndex from previously computed bucket offsets
+
+        Parameters
+        ----------
+        times: np.array
+            The time-ordered times the offsets were computed for
+        tstart: float
+            The start time of the first bucket
+        resolution: float
+            The width of the time buckets in seconds
+        offsets: np.array
+            The first row of each bucket, followed by the number of rows
+
+        Returns
+        -------
+        : :class:`TimeIndex`
+            The time index
+        """
+        obj = cls.__new__(cls)
+        obj._times = times
+        obj._tstart = float(tstart)
+        obj._resolution = float(resolution)
+        obj._offsets = np.asarray(offsets, dtype=np.intp)
+        return obj
+
+    @property
+    def tstart(self):
+        """(float): The start time of the first bucket"""
+        return self._tstart
+
+    @property
+    def resolution(self):
+        """(float): The width of the time buckets in seconds"""
+        return self._resolution
+
+    @property
+    def offsets(self):
+        """(np.array): The first row of each bucket, followed by the number of rows"""
+        return self._offsets
+
+    def _bisect(self, values, lo, hi, side):
+        """Vectorized bisection of the times inside the row ranges [lo, hi]"""
+        times = self._times
+        last = max(len(times) - 1, 0)
+        lo, hi = lo.copy(), hi.copy()
+        active = lo < hi
+        while np.any(active):
+            mid = (lo + hi) // 2
+            if side == "left":
+                right = times[np.minimum(mid, last)] < values
+            else:
+                right = times[np.minimum(mid, last)] <= values
+            lo = np.where(active & right, mid + 1, lo)
+            hi = np.where(active & ~right, mid, hi)
+            active = lo < hi
+        return lo
+
+    def searchsorted(self, values, side="left"):
+        """Find the rows where the values would be inserted to keep the times
+        ordered, same as :func:`numpy.searchsorted`
+
+        Parameters
+        ----------
+        values: float or np.array
+            The times to look up
+        side: str, optional
+            'left' for the first row with a time >= value, 'right' for the
+            first row with a time > value, by default 'left'
+
+        Returns
+        -------
+        : int or np.array
+            The rows
+        """
+        num_buckets = self._offsets.size - 1
+        if np.ndim(values) == 0:
+            # one value is bisected in a native-order copy of its buckets
+            if num_buckets == 0:
+                return 0
+            value = float(values)
+            position = (value - self._tstart) / self._resolution
+            if not position < num_buckets:
+                bucket = num_buckets - 1
+            else:
+                bucket = int(position) if position > 0 else 0
+            # widen by one bucket on each side against rounding of the edges
+            lo = int(self._offsets[max(bucket - 1, 0)])
+            hi = int(self._offsets[min(bucket + 2, num_buckets)])
+            times = np.asarray(self._times[lo:hi], dtype=np.float64)
+            return lo + int(np.searchsorted(times, value, side))
+
+        values = np.asarray(values, dtype=np.float64)
+        if num_buckets == 0:
+            return np.zeros(values.shape, dtype=np.intp)
+        bucket = np.floor((values - self._tstart) / self._resolution)
+        bucket = np.clip(bucket, 0, num_buckets - 1).astype(np.intp)
+        lo = self._offsets[np.maximum(bucket - 1, 0)]
+        hi = self._offsets[np.minimum(bucket + 2, num_buckets)]
+        return self._bisect(values, lo, hi, side)
+
+    def rows(self, tstart, tstop):
+        """The row range of a time range
+
+        Parameters
+        ----------
+        tstart, tstop: float
+            The time range, both ends included
+
+        Returns
+        -------
+        : (int, int)
+            The first row inside and the first row after the time range
+        """
+        return self.searchsorted(tstart, "left"), self.searchsorted(tstop, "right")
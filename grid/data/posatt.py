@@ -1,4 +1,3 @@
-import os
 import numpy as np
 from astropy.io import fits
 from pyquaternion import Quaternion
@@ -8,8 +7,7 @@ from gbm import coords
 from gbm.data import PosHist
 from gbm.coords import geocenter_in_radec
 
-from .. import data_path
-from ..utils import HIA
+from ..utils import load_hia
 from ..detector import Detector
 from ..utils.coords import xyz_to_radec
 
@@ -25,11 +23,8 @@ class PosAtt(PosHist):
         """
         super().__init__()
 
-        coord_path = os.path.join(data_path, d.id, "coord.txt")
-        flux_path = os.path.join(data_path, d.id, "flux.txt")
-
         self._detector = d
-        self._hia = HIA(coord_path, flux_path)
+        self._hia = load_hia(d.id)
 
     @property
     def detector(self):
@@ -0,0 +1,298 @@
+import numpy as np
+
+#: default clock resolution of the event times in seconds
+TICK_RESOLUTION = 1e-7
+
+#: the ticks of a segment share all but their lowest ``SEGMENT_BITS`` bits
+SEGMENT_BITS = 32
+
+#: the largest offset of a tick in its segment
+_OFFSET_MAX = (1 << SEGMENT_BITS) - 1
+
+
+class TickTimes:
+    """Event times as integer clock ticks since an epoch
+
+    The ticks are split in segments of ``2**32`` ticks, about 429 s at the
+    default resolution. Only the offset of each tick in its segment is
+    stored, as native-endian ``uint32``, with the first row of each segment,
+    so a time costs 4 bytes instead of 8 whatever the time span, and
+    comparisons and binning are integer operations on the offsets.
+
+    Parameters
+    ----------
+    epoch: float
+        The time of tick 0 in seconds
+    ticks: np.array
+        The time-ordered ticks
+    resolution: float, optional
+        The duration of a tick in seconds, by default ``TICK_RESOLUTION``
+    """
+
+    def __init__(self, epoch, ticks, resolution=TICK_RESOLUTION):
+        if resolution <= 0.0:
+            raise ValueError("resolution must be positive")
+        ticks = np.asarray(ticks, dtype=np.int64)
+        segments = ticks >> SEGMENT_BITS
+        starts = np.flatnonzero(segments[1:] != segments[:-1]) + 1
+        starts = np.append(0, starts) if ticks.size else starts
+        self._epoch = float(epoch)
+        self._offsets = (ticks & _OFFSET_MAX).astype(np.uint32)
+        self._segments = segments[starts]
+        self._rows = np.append(starts, ticks.size)
+        self._resolution = float(resolution)
+
+    @classmethod
+    def _from_segments(cls, epoch, offsets, segments, rows, resolution):
+        """Create TickTimes from the offsets and the segments, without copies"""
+        obj = cls.__new__(cls)
+        obj._epoch = epoch
+        obj._offsets = offsets
+        obj._segments = segments
+        obj._rows = rows
+        obj._resolution = resolution
+        return obj
+
+    @classmethod
+    def from_seconds(cls, times, resolution=TICK_RESOLUTION, epoch=None):
+        """Create TickTimes from times in seconds
+
+        The times are rounded to the nearest tick.
+
+        Parameters
+        ----------
+        times: np.array
+            The time-ordered times in seconds
+        resolution: float, optional
+            The duration of a tick in seconds, by default ``TICK_RESOLUTION``
+        epoch: float, optional
+            The time of tick 0 in seconds. If omitted, uses the first time
+            rounded down to a whole tick.
+
+        Returns
+        -------
+        : :class:`TickTimes`
+            The tick times
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if epoch is None:
+            epoch = np.floor(times[0] / resolution) * resolution if times.size else 0.0
+
+        ticks = np.rint((times - epoch) / resolution).astype(np.int64)
+        return cls(epoch, ticks, resolution)
+
+    @property
+    def epoch(self):
+        """(float): The time of tick 0 in seconds"""
+        return self._epoch
+
+    @property
+    def ticks(self):
+        """(np.array): The ticks, as ``int64``"""
+        bases = np.repeat(self._segments << SEGMENT_BITS, np.diff(self._rows))
+        return bases + self._offsets
+
+    @property
+    def resolution(self):
+        """(float): The duration of a tick in seconds"""
+        return self._resolution
+
+    @property
+    def seconds(self):
+        """(np.array): The times in seconds"""
+        return self._epoch + self.ticks * self._resolution
+
+    @property
+    def size(self):
+        """(int): The number of times"""
+        return self._offsets.size
+
+    def __len__(self):
+        return self._offsets.size
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            row = range(self.size)[item]
+            segment = self._segments[np.searchsorted(self._rows, row, "right") - 1]
+            tick = (int(segment) << SEGMENT_BITS) + int(self._offsets[row])
+            return self._epoch + tick * self._resolution
+        if isinstance(item, slice) and item.step in (None, 1):
+            # a view of the offsets, with the segments of the rows
+            start, stop, _ = item.indices(self.size)
+            stop = max(stop, start)
+            rows = np.clip(self._rows - start, 0, stop - start)
+            kept = rows[1:] > rows[:-1]
+            return TickTimes._from_segments(
+                self._epoch,
+                self._offsets[start:stop],
+                self._segments[kept],
+                np.append(rows[:-1][kept], stop - start),
+                self._resolution,
+            )
+        ticks = self.ticks[item]
+        if np.ndim(ticks) == 0:
+            return self._epoch + ticks * self._resolution
+        return TickTimes(self._epoch, ticks, self._resolution)
+
+    def _to_ticks(self, values, side):
+        """The smallest tick at or after (left) or after (right) each value"""
+        values = np.asarray(values, dtype=np.float64)
+        # values within the float precision of the seconds of a tick are on
+        # the tick, the seconds cannot tell them apart
+        tolerance = np.minimum(2.0 * np.spacing(np.abs(values)) / self._resolution, 0.5)
+        values = (values - self._epoch) / self._resolution
+        nearest = np.rint(values)
+        values = np.where(np.abs(values - nearest) <= tolerance, nearest, values)
+        if side == "left":
+            values = np.ceil(values)
+        else:
+            values = np.floor(values) + 1
+        return np.clip(values, -(2.0**62), 2.0**62).astype(np.int64)
+
+    def searchsorted(self, values, side="left"):
+        """Find the rows where the times would be inserted to keep the times
+        ordered, same as :func:`numpy.searchsorted` on the times in seconds
+
+        Parameters
+        ----------
+        values: float or np.array
+            The times in seconds to look up
+        side: str, optional
+            'left' for the first row with a time >= value, 'right' for the
+            first row with a time > value, by default 'left'
+
+        Returns
+        -------
+        : int or np.array
+            The rows
+        """
+        ticks = self._to_ticks(values, side)
+        flat = np.atleast_1d(ticks)
+        segments = flat >> SEGMENT_BITS
+        # the first segment at or after each tick, the rows before it are earlier
+        index = np.searchsorted(self._segments, segments, "left")
+        rows = self._rows[index]
+        found = index < self._segments.size
+        found[found] = self._segments[index[found]] == segments[found]
+        for one in np.unique(index[found]):
+            which = found & (index == one)
+            offsets = self._offsets[self._rows[one] : self._rows[one + 1]]
+            keys = (flat[which] & _OFFSET_MAX).astype(np.uint32)
+            rows[which] += np.searchsorted(offsets, keys, "left")
+        return rows if np.ndim(ticks) else rows[0]
+
+    def time_slice(self, tstart, tstop):
+        """The times inside a time range
+
+        Parameters
+        ----------
+        tstart, tstop: float
+            The time range in seconds, both ends included
+
+        Returns
+        -------
+        : :class:`TickTimes`
+            The times inside the time range, a view of the ticks
+        """
+        start = self.searchsorted(tstart, "left")
+        stop = self.searchsorted(tstop, "right")
+        return self[start:stop]
+
+    def _iter_bin_index(self, edges):
+        """The time bin of the times of each segment
+
+        The edges are converted to ticks once and taken relative to each
+        segment, so the offsets are binned as they are, without a copy to
+        ``int64``. Uniform edges are a floor division of the offsets, other
+        edges a bisection of the offsets.
+
+        Parameters
+        ----------
+        edges: np.array
+            The time edges in seconds
+
+        Yields
+        ------
+        : int
+            The first row of the segment
+        : np.array
+            The bin index of each time of the segment, -1 for times outside
+            of the bins
+        """
+        nbins = len(edges) - 1
+        lo = self._to_ticks(edges, "left")
+        last = self._to_ticks(edges[-1], "right")
+        width = lo[1] - lo[0] if nbins > 0 else 0
+        uniform = width > 0 and np.all(np.diff(lo) == width)
+
+        for segment, start, stop in zip(self._segments, self._rows, self._rows[1:]):
+            base = int(segment) << SEGMENT_BITS
+            offsets = self._offsets[start:stop]
+            index = np.empty(offsets.size, dtype=np.int64)
+            if uniform:
+                np.add(offsets, np.int64(base - lo[0]), out=index)
+                np.floor_divide(index, width, out=index)
+            else:
+                # the edges inside the segment, the earlier edges are below all offsets
+                first, stop_edge = np.searchsorted(lo, [base, base + _OFFSET_MAX + 1])
+                inside = (lo[first:stop_edge] - base).astype(np.uint32)
+                index[:] = np.searchsorted(inside, offsets, "right")
+                index += first - 1
+
+            # a time on the last edge belongs to the last bin
+            local_last = last - base
+            if local_last <= 0:
+                index[:] = -1
+            elif local_last > _OFFSET_MAX:
+                index[index >= nbins - 1] = nbins - 1
+                index[index < 0] = -1
+            else:
+                before = offsets < np.uint32(local_last)
+                index[(index >= nbins - 1) & before] = nbins - 1
+                index[(index < 0) | ~before] = -1
+            yield start, index
+
+    def bin_index(self, edges):
+        """The time bin of each time
+
+        Parameters
+        ----------
+        edges: np.array
+            The time edges in seconds
+
+        Returns
+        -------
+        : np.array
+            The bin index of each time, -1 for times outside of the bins. A
+            time on the last edge belongs to the last bin.
+        """
+        result = np.empty(self.size, dtype=np.int64)
+        for start, index in self._iter_bin_index(edges):
+            result[start : start + index.size] = index
+        return result
+
+    def bin(self, edges):
+        """Count the times in time bins
+
+        The times are counted segment by segment, so no index of all the
+        times is built.
+
+        Parameters
+        ----------
+        edges: np.array
+            The time edges in seconds
+
+        Returns
+        -------
+        : np.array
+            The number of times in each bin
+        """
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        for _, index in self._iter_bin_index(edges):
+            # the bins of a segment are a range, the times being ordered
+            index = index[index >= 0]
+            if index.size:
+                first = index[0]
+                segment_counts = np.bincount(index - first)
+                counts[first : first + segment_counts.size] += segment_counts
+        return counts
@@ -1,5 +1,6 @@
 class Detector(object):
-    def __init__(self, id: str, normal=(0, 0, -1), deadtime=0):
+    def __init__(self, id: str, normal=(0, 0, -1), deadtime=0, deadtime_unit=1e-6):
         self.id = id
         self.normal = normal
         self.deadtime = deadtime
+        self.deadtime_unit = deadtime_unit
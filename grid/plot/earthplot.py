@@ -1,4 +1,3 @@
-import os
 import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib.ticker import FuncFormatter
@@ -6,8 +5,7 @@ from matplotlib.ticker import FuncFormatter
 from gbm.plot import EarthPlot
 from gbm.plot.gbmplot import EarthLine
 
-from ..utils import HIA
-from .. import data_path
+from ..utils import load_hia
 from ..data import PosAtt
 from ..icon import GRIDIcon
 
@@ -98,9 +96,7 @@ class EarthPlotGRID(EarthPlot):
             self._fermi = GRIDIcon(lat, lon, self._m, self._ax)
 
         if hia:
-            coord_path = os.path.join(data_path, data.detector.id, "coord.txt")
-            flux_path = os.path.join(data_path, data.detector.id, "flux.txt")
-            self._hia = HIA(coord_path, flux_path)
+            self._hia = load_hia(data.detector.id)
             self._plot_hia(nx, ny)
 
     def plot_orbit(self, data, color="blue", numpts=1000):
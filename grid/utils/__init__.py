@@ -1,3 +1,5 @@
-from .clip import SigmaClip
-from .hia import HIA
+from .clip import RollingSigmaClip, SigmaClip
+from .hia import HIA, load_hia
+from .t90tools import duration, t50, t90
+from .trigger import TriggerSearch
 from .utils import *
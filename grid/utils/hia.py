@@ -1,6 +1,87 @@
+import os
+import tempfile
+from functools import lru_cache
+
 import numpy as np
 from scipy.interpolate import NearestNDInterpolator
 
+from .. import data_path
+
+
+def _cache_path(coord_path, flux_path):
+    """Path of the binary copy of a parsed grid, next to the coordinate file
+
+    The name is made of the names of both text files, e.g.
+    ``coord_flux.npz``, so that every pair of files has its own copy.
+
+    Parameters
+    ----------
+    coord_path : str
+        coordinate file path
+    flux_path: str
+        flux file path
+
+    Returns
+    -------
+    : str
+        path of the binary copy
+    """
+    names = [
+        os.path.splitext(os.path.basename(path))[0] for path in (coord_path, flux_path)
+    ]
+    return os.path.join(os.path.dirname(coord_path), "_".join(names) + ".npz")
+
+
+def _read_grid(coord_path, flux_path):
+    """Read the coordinates and fluxes of the grid
+
+    The parsed grid is persisted next to the text files, under a name made
+    of both file names, and read from there as long as it is newer than both
+    text files and was parsed from the same paths.
+
+    Parameters
+    ----------
+    coord_path : str
+        coordinate file path
+    flux_path: str
+        flux file path
+
+    Returns
+    -------
+    : np.array
+        (lat, lon) of each grid point
+    : np.array
+        flux of each grid point
+    """
+    cache_path = _cache_path(coord_path, flux_path)
+    sources = np.array([os.path.abspath(coord_path), os.path.abspath(flux_path)])
+    try:
+        mtime = max(os.path.getmtime(coord_path), os.path.getmtime(flux_path))
+        if os.path.getmtime(cache_path) >= mtime:
+            with np.load(cache_path) as cache:
+                if np.array_equal(cache["sources"], sources):
+                    return cache["coord"], cache["flux"]
+    except (OSError, KeyError, ValueError):
+        pass
+
+    coord = np.loadtxt(coord_path, comments="'", skiprows=26, delimiter=",")[
+        :, 1:3
+    ].astype(np.float64)
+    flux = np.loadtxt(flux_path, comments="'", skiprows=30, delimiter=",")[:, 2]
+    flux[flux <= 0] = 0
+
+    # write to a temporary file first so that readers never see a partial file,
+    # a read-only installation simply parses the text files every time
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, coord=coord, flux=flux, sources=sources)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return coord, flux
+
 
 class HIA:
     """High Ion Area
@@ -8,9 +89,7 @@ class HIA:
     Attributes
     ----------
     _mapping : method
-        coordinate - flux function
-    _indmapping : method
-        Nearest-neighbor interpolation
+        Nearest-neighbor interpolation of the flux
 
     Parameters
     ----------
@@ -22,18 +101,8 @@ class HIA:
 
     def __init__(self, coord_path, flux_path):
         """Generate coordinate - flux functions"""
-        coord = np.loadtxt(coord_path, comments="'", skiprows=26, delimiter=",")[
-            :, 1:3
-        ].astype(np.float)
-        flux = np.loadtxt(flux_path, comments="'", skiprows=30, delimiter=",")[:, 2]
-        flux[flux <= 0] = 0
-
-        ind = np.zeros_like(flux).astype(np.bool)
-        ind[flux > 0] = 1
-
-        ind = ind.reshape(90 * 121)
+        coord, flux = _read_grid(coord_path, flux_path)
         self._mapping = NearestNDInterpolator(coord, flux)
-        self._indmapping = NearestNDInterpolator(coord, ind)
 
     def flux(self, lat, lon):
         """Get flux
@@ -62,4 +131,24 @@ class HIA:
          : array
             Boolean array for each point where True indicates the point is in the HIA.
         """
-        return self._indmapping(lat, lon)
+        return self._mapping(lat, lon) > 0
+
+
+@lru_cache(maxsize=None)
+def load_hia(detector_id):
+    """The HIA of a detector, built once per process
+
+    Parameters
+    ----------
+    detector_id : str
+        id of the detector, e.g. ``"G02"``
+
+    Returns
+    -------
+     : :class:`HIA`
+        HIA built from the grid files of the detector
+    """
+    return HIA(
+        os.path.join(data_path, detector_id, "coord.txt"),
+        os.path.join(data_path, detector_id, "flux.txt"),
+    )
@@ -0,0 +1,222 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def _light_curve(data):
+    """Counts and edges of a light curve
+
+    Parameters
+    ----------
+    data: :class:`~gbm.data.Cspec`, :class:`~gbm.data.primitives.TimeEnergyBins` or :class:`~gbm.data.primitives.TimeBins`
+        The light curve, e.g. from :meth:`~grid.data.Evt.to_phaii`, the
+        channels are summed
+
+    Returns
+    -------
+    : np.array
+        The counts of each bin
+    : np.array
+        The lower edge of each bin
+    : np.array
+        The upper edge of each bin
+    """
+    data = getattr(data, "data", data)
+    counts = np.asarray(data.counts, dtype=np.float64)
+    if counts.ndim == 2:
+        counts = counts.sum(axis=1)
+        return counts, np.asarray(data.tstart), np.asarray(data.tstop)
+    return counts, np.asarray(data.lo_edges), np.asarray(data.hi_edges)
+
+
+def _quantile_times(counts, background, lo_edges, hi_edges, levels):
+    """Times where the cumulative net counts reach fractions of their total
+
+    Parameters
+    ----------
+    counts: np.array
+        The counts of each bin, shape (number of light curves, number of bins)
+    background: np.array
+        The background counts of each bin
+    lo_edges, hi_edges: np.array
+        The edges of the bins
+    levels: list of float
+        The fractions of the total net counts
+
+    Returns
+    -------
+    : np.array
+        The time of each light curve and fraction, shape (number of light
+        curves, number of fractions), NaN if the total is not positive
+    """
+    cumulative = np.cumsum(counts - background, axis=1)
+    total = cumulative[:, -1:]
+    times = np.full((counts.shape[0], len(levels)), np.nan)
+    for i, level in enumerate(levels):
+        target = level * total
+        reached = cumulative >= target
+        # first bin where the cumulative counts reach the level
+        index = np.argmax(reached, axis=1)[:, None]
+        after = np.take_along_axis(cumulative, index, axis=1)
+        before = np.where(
+            index > 0,
+            np.take_along_axis(cumulative, np.maximum(index - 1, 0), axis=1),
+            0.0,
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.clip((target - before) / (after - before), 0.0, 1.0)
+        fraction = np.where(np.isfinite(fraction), fraction, 1.0)
+        lo, hi = lo_edges[index], hi_edges[index]
+        time = (lo + fraction * (hi - lo))[:, 0]
+        valid = (total[:, 0] > 0) & reached.any(axis=1)
+        times[:, i] = np.where(valid, time, np.nan)
+    return times
+
+
+def _simulate(counts, background, lo_edges, hi_edges, levels, num_sims, seed):
+    """Quantile times of Poisson resamplings of the counts, in one 2D array
+
+    Parameters
+    ----------
+    counts: np.array
+        The counts of each bin
+    background: np.array
+        The background counts of each bin
+    lo_edges, hi_edges: np.array
+        The edges of the bins
+    levels: list of float
+        The fractions of the total net counts
+    num_sims: int
+        The number of resamplings
+    seed: :class:`numpy.random.SeedSequence`
+        The seed of the resamplings
+
+    Returns
+    -------
+    : np.array
+        The times of each resampling and fraction
+    """
+    rng = np.random.default_rng(seed)
+    resampled = rng.poisson(counts, size=(num_sims, counts.size)).astype(np.float64)
+    return _quantile_times(resampled, background, lo_edges, hi_edges, levels)
+
+
+def duration(
+    lightcurve,
+    background,
+    fraction=0.9,
+    num_sims=1000,
+    confidence=0.6827,
+    workers=None,
+    seed=None,
+):
+    """Estimate the duration containing a fraction of the net counts, e.g. T90
+
+    The start and stop are the times where the cumulative background
+    subtracted counts reach ``(1 - fraction) / 2`` and ``(1 + fraction) / 2``
+    of the total. Their uncertainties, and the uncertainty of the duration,
+    come from the quantiles of the same times and of their difference over
+    Poisson resamplings of the counts, so that the correlation of the start
+    and stop is kept.
+
+    Parameters
+    ----------
+    lightcurve: :class:`~gbm.data.Cspec` or :class:`~gbm.data.primitives.TimeBins`
+        The light curve, e.g. from :meth:`~grid.data.Evt.to_phaii`
+    background: float or np.array
+        The background counts of each bin
+    fraction: float, optional
+        The fraction of the net counts, by default 0.9
+    num_sims: int, optional
+        The number of Poisson resamplings, by default 1000
+    confidence: float, optional
+        The confidence level of the uncertainties, by default 0.6827
+    workers: int, optional
+        If set, the resamplings are split across up to ``workers`` processes
+    seed: int, optional
+        The seed of the resamplings
+
+    Returns
+    -------
+    : np.array
+        The start time, stop time and duration
+    : np.array
+        The upper bounds of the start time, stop time and duration
+    : np.array
+        The lower bounds of the start time, stop time and duration
+    """
+    counts, lo_edges, hi_edges = _light_curve(lightcurve)
+    background = np.broadcast_to(np.asarray(background, dtype=np.float64), counts.shape)
+    levels = [(1 - fraction) / 2, (1 + fraction) / 2]
+    yp = _quantile_times(counts[None, :], background, lo_edges, hi_edges, levels)[0]
+    yp = np.append(yp, yp[1] - yp[0])
+
+    # split the resamplings in independent streams
+    num_jobs = 1 if workers is None else max(min(workers, num_sims), 1)
+    seeds = np.random.SeedSequence(seed).spawn(num_jobs)
+    sizes = np.diff(np.linspace(0, num_sims, num_jobs + 1).astype(int))
+    args = (counts, background, lo_edges, hi_edges, levels)
+    if workers is None:
+        times = _simulate(*args, sizes[0], seeds[0])
+    else:
+        with ProcessPoolExecutor(max_workers=num_jobs) as pool:
+            jobs = [
+                pool.submit(_simulate, *args, size, s) for size, s in zip(sizes, seeds)
+            ]
+            times = np.vstack([job.result() for job in jobs])
+    times = np.column_stack((times, times[:, 1] - times[:, 0]))
+
+    quantiles = [100 * (1 - confidence) / 2, 100 * (1 + confidence) / 2]
+    with warnings.catch_warnings():
+        # no resampling with positive net counts gives NaN bounds
+        warnings.simplefilter("ignore", RuntimeWarning)
+        ypp, ypn = np.nanpercentile(times, quantiles, axis=0)
+    return yp, ypn, ypp
+
+
+def t90(lightcurve, background, **kwargs):
+    """T90 of a light curve, see :func:`duration`
+
+    The result can be formatted with
+    ``T90_string(*t90(lightcurve, background))``.
+
+    Parameters
+    ----------
+    lightcurve: :class:`~gbm.data.Cspec` or :class:`~gbm.data.primitives.TimeBins`
+        The light curve, e.g. from :meth:`~grid.data.Evt.to_phaii`
+    background: float or np.array
+        The background counts of each bin
+
+    Returns
+    -------
+    : np.array
+        The start time, stop time and duration
+    : np.array
+        The upper bounds of the start time, stop time and duration
+    : np.array
+        The lower bounds of the start time, stop time and duration
+    """
+    return duration(lightcurve, background, fraction=0.9, **kwargs)
+
+
+def t50(lightcurve, background, **kwargs):
+    """T50 of a light curve, see :func:`duration`
+
+    Parameters
+    ----------
+    lightcurve: :class:`~gbm.data.Cspec` or :class:`~gbm.data.primitives.TimeBins`
+        The light curve, e.g. from :meth:`~grid.data.Evt.to_phaii`
+    background: float or np.array
+        The background counts of each bin
+
+    Returns
+    -------
+    : np.array
+        The start time, stop time and duration
+    : np.array
+        The upper bounds of the start time, stop time and duration
+    : np.array
+        The lower bounds of the start time, stop time and duration
+    """
+    return duration(lightcurve, background, fraction=0.5, **kwargs)
@@ -0,0 +1,224 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from gbm.binning.unbinned import bin_by_time
+
+from .utils import Significance
+
+#: layout of the candidate triggers returned by :class:`TriggerSearch`
+TRIGGER_DTYPE = [
+    ("tstart", "f8"),
+    ("tstop", "f8"),
+    ("timescale", "f8"),
+    ("band", "i4"),
+    ("counts", "f8"),
+    ("background", "f8"),
+    ("significance", "f8"),
+]
+
+
+def _in_gti(lo_edges, hi_edges, gti):
+    """Whether each bin is entirely inside one of the good time intervals
+
+    Parameters
+    ----------
+    lo_edges, hi_edges: np.array
+        The edges of the bins
+    gti: [(float, float), ...]
+        The good time intervals, not overlapping
+
+    Returns
+    -------
+    : np.array
+        True for the bins inside an interval
+    """
+    gti = np.reshape(np.asarray(gti, dtype=np.float64), (-1, 2))
+    gti = gti[np.argsort(gti[:, 0], kind="stable")]
+    # the last interval starting at or before each bin
+    index = np.searchsorted(gti[:, 0], lo_edges, side="right") - 1
+    return (index >= 0) & (hi_edges <= gti[np.maximum(index, 0), 1])
+
+
+class TriggerSearch:
+    """Search light curves for count excesses on several timescales
+
+    The events are binned once at ``dt`` per energy band. The counts of
+    every window of every timescale come from prefix sums of the bins, the
+    background of a window is the rate of a lagging window that ends
+    ``bkg_gap`` before it, and all the windows of a timescale are scored at
+    once with :class:`~grid.utils.utils.Significance`. The windows whose
+    source or background range has a bin without exposure or outside the
+    good time intervals are skipped.
+
+    Parameters
+    ----------
+    timescales: list of float
+        The durations of the windows, multiples of ``dt``
+    threshold: float, optional
+        The significance of a candidate trigger, by default 4.5
+    phases: int, optional
+        The number of window starts per timescale, the windows of a timescale
+        start every ``timescale / phases``, by default 2
+    dt: float, optional
+        The width of the bins, by default the shortest timescale divided by
+        ``phases``
+    bkg_duration: float, optional
+        The duration of the background window, by default 20
+    bkg_gap: float, optional
+        The time between the end of the background window and the start of
+        the window, by default 4
+    bands: [(float, float), ...], optional
+        The energy range of each band. If omitted, a single band of all
+        channels.
+    """
+
+    def __init__(
+        self,
+        timescales,
+        threshold=4.5,
+        phases=2,
+        dt=None,
+        bkg_duration=20.0,
+        bkg_gap=4.0,
+        bands=None,
+    ):
+        self.timescales = np.sort(np.atleast_1d(np.asarray(timescales, dtype=float)))
+        self.threshold = threshold
+        self.phases = int(phases)
+        self.dt = self.timescales[0] / self.phases if dt is None else float(dt)
+        self.bkg_duration = bkg_duration
+        self.bkg_gap = bkg_gap
+        self.bands = bands
+
+        # the windows are whole numbers of bins
+        self._cells = np.rint(self.timescales / self.dt).astype(int)
+        if np.any(self._cells < 1) or not np.allclose(
+            self._cells * self.dt, self.timescales
+        ):
+            raise ValueError("the timescales must be multiples of dt")
+        self._bkg_cells = max(int(round(bkg_duration / self.dt)), 1)
+        self._gap_cells = int(round(bkg_gap / self.dt))
+        self._significance = Significance()
+
+    def __call__(self, evt, time_range=None, workers=None):
+        """Search the events of an Evt object
+
+        Parameters
+        ----------
+        evt: :class:`~grid.data.Evt`
+            The Evt object, or any object with a ``to_lightcurves`` method
+        time_range: (float, float), optional
+            The time range to search. If omitted, uses the entire time range of the data.
+        workers: int, optional
+            If set, the bands are searched in up to ``workers`` threads
+
+        Returns
+        -------
+        : np.ndarray
+            The candidate triggers with ``TRIGGER_DTYPE``, ordered by start time
+        """
+        bands = self.bands if self.bands is not None else [(0.0, np.inf)]
+        lightcurves = evt.to_lightcurves(
+            bin_by_time, self.dt, bands=bands, time_range=time_range
+        )
+        return self.search(lightcurves, workers=workers, gti=evt.gti)
+
+    def search(self, lightcurves, workers=None, gti=None):
+        """Search light curves binned at ``dt``
+
+        Parameters
+        ----------
+        lightcurves: list of :class:`~gbm.data.primitives.TimeBins`
+            The light curve of each band
+        workers: int, optional
+            If set, the bands are searched in up to ``workers`` threads
+        gti: [(float, float), ...], optional
+            The good time intervals. If set, the windows with a bin outside
+            the intervals are skipped, otherwise only the windows with a bin
+            without exposure.
+
+        Returns
+        -------
+        : np.ndarray
+            The candidate triggers with ``TRIGGER_DTYPE``, ordered by start time
+        """
+        jobs = list(enumerate(lightcurves))
+        if workers is None:
+            found = [self._search_band(band, lc, gti) for band, lc in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                found = list(pool.map(lambda job: self._search_band(*job, gti), jobs))
+
+        candidates = np.concatenate([np.zeros(0, dtype=TRIGGER_DTYPE)] + found)
+        return candidates[np.argsort(candidates["tstart"], kind="stable")]
+
+    def _search_band(self, band, lightcurve, gti=None):
+        """The candidate triggers of one band
+
+        Parameters
+        ----------
+        band: int
+            The index of the band
+        lightcurve: :class:`~gbm.data.primitives.TimeBins`
+            The light curve of the band
+        gti: [(float, float), ...], optional
+            The good time intervals
+
+        Returns
+        -------
+        : np.ndarray
+            The candidate triggers with ``TRIGGER_DTYPE``
+        """
+        lo_edges = np.asarray(lightcurve.lo_edges, dtype=np.float64)
+        hi_edges = np.asarray(lightcurve.hi_edges, dtype=np.float64)
+        num_bins = lo_edges.size
+        # bins without exposure or in a data gap, where the counts are missing
+        bad = np.asarray(lightcurve.exposure) <= 0
+        if gti is not None:
+            bad |= ~_in_gti(lo_edges, hi_edges, gti)
+
+        counts = np.concatenate(([0.0], np.cumsum(lightcurve.counts)))
+        exposure = np.concatenate(([0.0], np.cumsum(lightcurve.exposure)))
+        # the number of bad bins before each bin
+        num_bad = np.concatenate(([0], np.cumsum(bad)))
+
+        found = []
+        for timescale, cells in zip(self.timescales, self._cells):
+            # the first window has a complete background window before it
+            first = self._gap_cells + self._bkg_cells
+            step = max(cells // self.phases, 1)
+            start = np.arange(first, num_bins - cells + 1, step)
+            stop = start + cells
+            bkg_stop = start - self._gap_cells
+            bkg_start = bkg_stop - self._bkg_cells
+
+            n = counts[stop] - counts[start]
+            src_exposure = exposure[stop] - exposure[start]
+            bkg_counts = counts[bkg_stop] - counts[bkg_start]
+            bkg_exposure = exposure[bkg_stop] - exposure[bkg_start]
+            # the source and background ranges are entirely in good time
+            good = (num_bad[stop] == num_bad[start]) & (
+                num_bad[bkg_stop] == num_bad[bkg_start]
+            )
+            n, src_exposure = n[good], src_exposure[good]
+            bkg_counts, bkg_exposure = bkg_counts[good], bkg_exposure[good]
+            start, stop = start[good], stop[good]
+
+            # background expected in the window and its Poisson uncertainty
+            scale = src_exposure / bkg_exposure
+            b = bkg_counts * scale
+            sigma = np.sqrt(np.maximum(bkg_counts, 1.0)) * scale
+            significance = self._significance(n, b, sigma)
+
+            hit = np.flatnonzero(significance >= self.threshold)
+            candidates = np.zeros(hit.size, dtype=TRIGGER_DTYPE)
+            candidates["tstart"] = lo_edges[start[hit]]
+            candidates["tstop"] = hi_edges[stop[hit] - 1]
+            candidates["timescale"] = timescale
+            candidates["band"] = band
+            candidates["counts"] = n[hit]
+            candidates["background"] = b[hit]
+            candidates["significance"] = significance[hit]
+            found.append(candidates)
+
+        return np.concatenate(found)
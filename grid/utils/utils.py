@@ -11,16 +11,40 @@ class Significance(object):
         pass
 
     def __sgn(self, x):
-        return -1 if x < 0 else 1
+        return np.where(x < 0, -1.0, 1.0)
 
     def __maximum_B(self, n, b, sigma):
-        B = b**2 - 2 * b * sigma**2 + 4 * n * sigma**2 + sigma**4
-        return (b - sigma**2 + np.sqrt(B)) / 2
+        # the root of the quadratic without cancellation when b < sigma**2,
+        # which gives B = 0 for n = 0
+        d = b - sigma**2
+        r = np.sqrt(d**2 + 4 * n * sigma**2)
+        return np.where(d >= 0, (d + r) / 2, 2 * n * sigma**2 / (r - d))
 
     def __call__(self, n, b, sigma):
-        B = self.__maximum_B(n, b, sigma)
-        S = n * np.log(n / B) + (b - B) ** 2 / (2 * sigma**2) + B - n
-        return self.__sgn(n - b) * np.sqrt(2 * S)
+        """Significance of the counts over a background known with an uncertainty
+
+        Parameters
+        ----------
+        n: float or np.array
+            The counts
+        b: float or np.array
+            The expected background counts
+        sigma: float or np.array
+            The uncertainty of the background counts
+
+        Returns
+        -------
+        : float or np.array
+            The signed significance, with the broadcast shape of the inputs
+        """
+        n, b, sigma = (np.asarray(x, dtype=np.float64) for x in (n, b, sigma))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            B = self.__maximum_B(n, b, sigma)
+            # n * log(n / B) vanishes for n = 0
+            S = np.where(n > 0, n * np.log(n / B), 0.0)
+            S += (b - B) ** 2 / (2 * sigma**2) + B - n
+        result = self.__sgn(n - b) * np.sqrt(2 * np.maximum(S, 0.0))
+        return result[()]
 
 
 def binary_search(data, t):
@@ -61,10 +85,14 @@ def T90_string(yp, ypn, ypp):
         sum_ = 0
         for d in data:
             sum_ += d**2
-        return np.sqrt(d)
+        return np.sqrt(sum_)
 
     t_fmt = "{:>5.2f}^{{+{:>5.2f}}}_{{-{:>5.2f}}}"
-    s_total = t_fmt.format(yp[1] - yp[0], get_rs(ypn - yp), get_rs(ypp - yp))
+    if len(yp) > 2:
+        # the duration and its bounds, e.g. from `t90`
+        s_total = t_fmt.format(yp[2], ypn[2] - yp[2], abs(ypp[2] - yp[2]))
+    else:
+        s_total = t_fmt.format(yp[1] - yp[0], get_rs(ypn - yp), get_rs(ypp - yp))
     s_start = t_fmt.format(yp[0], ypn[0] - yp[0], abs(ypp[0] - yp[0]))
     s_end = t_fmt.format(yp[1], ypn[1] - yp[1], abs(ypp[1] - yp[1]))
-    return "$T_{90}\ =\ " + s_total + "\ from\ " + s_start + "\ to\ " + s_end + "$"
+    return r"$T_{90}\ =\ " + s_total + r"\ from\ " + s_start + r"\ to\ " + s_end + "$"